@@ -1,24 +1,64 @@
-import mysql.connector
+from collections import namedtuple
+
 from mysql.connector import Error
 
-def stream_users():
-    """Generator that streams rows from the user_data table one by one"""
+from seed import connect_to_prodev
+
+USER_COLUMNS = ('user_id', 'name', 'email', 'age')
+
+User = namedtuple('User', USER_COLUMNS)
+
+class UserRecord:
+    """Slotted user row: no per-instance dict, so far smaller than a row dict"""
+    __slots__ = USER_COLUMNS
+
+    def __init__(self, user_id, name, email, age):
+        self.user_id = user_id
+        self.name = name
+        self.email = email
+        self.age = age
+
+    def __repr__(self):
+        return (f"UserRecord(user_id={self.user_id!r}, name={self.name!r}, "
+                f"email={self.email!r}, age={self.age!r})")
+
+def stream_users(fetch_size=1000, row_factory=None):
+    """Generator that streams rows from the user_data table one by one
+
+    The cursor is unbuffered, so rows are read off the socket fetch_size at a
+    time instead of the whole result set being materialised client-side.
+    Rows are dicts by default; pass row_factory=User or UserRecord (or any
+    callable taking user_id, name, email, age) for compact rows with int ages.
+    """
+    connection = None
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='root',
-            database='ALX_prodev'
-        )
+        connection = connect_to_prodev(dedicated=True)
+        if connection is None:
+            return
         
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM user_data")
+        if row_factory is None:
+            cursor = connection.cursor(dictionary=True, buffered=False)
+            cursor.execute("SELECT * FROM user_data")
+        else:
+            cursor = connection.cursor(buffered=False)
+            cursor.execute(f"SELECT {', '.join(USER_COLUMNS)} FROM user_data")
         
-        for row in cursor:
-            yield row
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            if row_factory is None:
+                yield from rows
+            else:
+                for user_id, name, email, age in rows:
+                    yield row_factory(user_id, name, email, int(age))
             
         cursor.close()
-        connection.close()
         
     except Error as e:
         print(f"Error streaming users: {e}")
+    finally:
+        # Closing the dedicated connection drops any unread rows if the
+        # consumer stopped early
+        if connection is not None:
+            connection.close()
@@ -1,47 +1,113 @@
-import mysql.connector
+import operator
 from mysql.connector import Error
 
+from seed import connect_to_prodev
 
-def stream_users_in_batches(batch_size):
-    """Generator that fetches rows in batches from the user_data table"""
+FILTER_COLUMNS = ('user_id', 'name', 'email', 'age')
+FILTER_OPERATORS = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+class Predicate:
+    """A column comparison that compiles to SQL and also runs in Python"""
+
+    def __init__(self, column, op, value):
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"Cannot filter on column {column!r}")
+        if op not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported operator {op!r}")
+        self.column = column
+        self.op = op
+        self.value = value
+
+    def to_sql(self):
+        """Returns the parameterized SQL condition and its parameters"""
+        return f"{self.column} {self.op} %s", [self.value]
+
+    def __call__(self, row):
+        return FILTER_OPERATORS[self.op](row[self.column], self.value)
+
+    def __repr__(self):
+        return f"Predicate({self.column!r}, {self.op!r}, {self.value!r})"
+
+
+def compile_filters(where):
+    """Splits where into a SQL WHERE clause and Python-only filters
+
+    where may be a Predicate, any callable taking a row, or a list of those
+    combined with AND. Predicates are pushed down into SQL; other callables
+    are applied to each fetched row.
+    """
+    if where is None:
+        return '', [], []
+    if not isinstance(where, (list, tuple)):
+        where = [where]
+
+    clauses, params, python_filters = [], [], []
+    for condition in where:
+        if isinstance(condition, Predicate):
+            clause, values = condition.to_sql()
+            clauses.append(clause)
+            params.extend(values)
+        else:
+            python_filters.append(condition)
+    return ' AND '.join(clauses), params, python_filters
+
+
+def stream_users_in_batches(batch_size, where=None):
+    """Generator that fetches rows in batches from the user_data table
+
+    Batches are read with fetchmany on an unbuffered cursor, so peak memory
+    is bounded by batch_size rather than by the size of the table.
+    """
+    clause, params, python_filters = compile_filters(where)
+    connection = None
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='root',
-            database='ALX_prodev'
-        )
-
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM user_data")
-
-        batch = []
-        for row in cursor:
-            batch.append(row)
-            if len(batch) == batch_size:
-                yield batch
-                batch = []
+        connection = connect_to_prodev(dedicated=True)
+        if connection is None:
+            return
+
+        cursor = connection.cursor(dictionary=True, buffered=False)
+        if clause:
+            cursor.execute(f"SELECT * FROM user_data WHERE {clause}", params)
+        else:
+            cursor.execute("SELECT * FROM user_data")
 
-        # Yield remaining rows if any
-        if batch:
-            yield batch
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            if python_filters:
+                batch = [row for row in batch if all(check(row) for check in python_filters)]
+            if batch:
+                yield batch
 
         cursor.close()
-        connection.close()
         return
 
     except Error as e:
         print(f"Error streaming users in batches: {e}")
         return
+    finally:
+        if connection is not None:
+            connection.close()
+
 
+def batch_processing(batch_size, where=Predicate('age', '>', 25)):
+    """Processes each batch to filter users over the age of 25
 
-def batch_processing(batch_size):
-    """Processes each batch to filter users over the age of 25"""
+    The age filter runs in MySQL, so only matching rows are transferred.
+    """
     try:
-        for batch in stream_users_in_batches(batch_size):
+        for batch in stream_users_in_batches(batch_size, where):
             for user in batch:
-                if user['age'] > 25:
-                    print(user)
+                print(user)
         return
     except Exception as e:
         print(f"Error in batch processing: {e}")
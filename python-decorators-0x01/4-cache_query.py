@@ -2,21 +2,399 @@ import time
 import sqlite3
 import functools
 import hashlib
+import inspect
 import json
 import logging
+import re
+import sys
+import threading
+import weakref
+from collections import OrderedDict
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Global cache dictionary
-query_cache = {}
+def estimate_size(obj):
+    """Estimate the memory held by a query result, in bytes."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(key) + estimate_size(value) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item) for item in obj)
+    return size
+
+class LRUCache:
+    """Cache backend with LRU eviction, per-entry TTL and a max-bytes budget.
+
+    Safe to share between threads. Any object with the same
+    get/set/delete/invalidate/clear/values/stats methods can be passed to
+    cache_query as its backend.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, ttl=300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl  # seconds; None keeps entries until they are evicted
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._expired(entry)
+
+    def _expired(self, entry):
+        return entry['expires_at'] is not None and entry['expires_at'] <= time.time()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.bytes -= entry['size']
+        return entry
+
+    def get(self, key, stale=None):
+        """Return the entry for key (marking it most recently used), or None.
+
+        With stale (seconds), an entry that expired less than that long ago
+        is still returned; the caller can tell from its expires_at.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry):
+                if stale and entry['expires_at'] + stale > time.time():
+                    self.stale_hits += 1
+                else:
+                    self._remove(key)
+                    self.expirations += 1
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            entry['hits'] = entry.get('hits', 0) + 1
+            return entry
+
+    def hottest(self, count, expiring_within):
+        """The count most hit refreshable entries expiring within the given seconds.
+
+        Hits are counted since the entry was last stored. Returns (key, entry) pairs.
+        """
+        deadline = time.time() + expiring_within
+        with self._lock:
+            candidates = [
+                (key, entry) for key, entry in self._entries.items()
+                if entry.get('refresh') is not None and entry.get('hits')
+                and entry['expires_at'] is not None and entry['expires_at'] <= deadline
+            ]
+        candidates.sort(key=lambda item: item[1]['hits'], reverse=True)
+        return candidates[:count]
+
+    def set(self, key, result, ttl=None, **metadata):
+        """Store result under key, evicting least recently used entries as needed."""
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        entry = dict(
+            metadata,
+            result=result,
+            timestamp=now,
+            expires_at=now + ttl if ttl is not None else None,
+            size=estimate_size(result)
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if entry['size'] > self.max_bytes:
+                logger.info(f"Result of {entry['size']} bytes exceeds the cache budget - not cached")
+                return entry
+            self._entries[key] = entry
+            self.bytes += entry['size']
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return entry
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate(self, tables):
+        """Drop entries that read any of tables; returns how many were dropped.
+
+        Entries whose tables are unknown (None) are dropped by any write.
+        """
+        tables = {table.lower() for table in tables}
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if entry.get('tables') is None or entry['tables'] & tables
+            ]
+            for key in stale:
+                self._remove(key)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def values(self):
+        with self._lock:
+            return list(self._entries.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'stale_hits': self.stale_hits,
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'max_entries': self.max_entries
+            }
+
+# Global cache, shared by every cache_query function unless given its own backend
+query_cache = LRUCache()
+
+# Backends passed to cache_query(backend=...), so writes can invalidate them
+# too. Held weakly: a backend is dropped once no decorated function uses it.
+cache_backends = weakref.WeakSet()
+
+READ_ACTIONS = {sqlite3.SQLITE_READ}
+WRITE_ACTIONS = {sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE}
+
+def track_tables(conn, actions, tables):
+    """Record in tables the names of tables touched by statements prepared on conn.
+
+    Uses the SQLite authorizer, so it sees tables reached through joins,
+    subqueries and views. Returns False if conn does not support it.
+    """
+    if not hasattr(conn, 'set_authorizer'):
+        return False
+
+    def authorizer(action, arg1, arg2, db_name, trigger):
+        if action in actions and arg1 and not arg1.startswith('sqlite_'):
+            tables.add(arg1.lower())
+        return sqlite3.SQLITE_OK
+
+    conn.set_authorizer(authorizer)
+    return True
+
+# Write generations: a counter bumped by every committed write, the value it
+# had at each table's last write, and at the last write to unknown tables.
+# load() compares them with a snapshot taken before running its query, so a
+# result read before a concurrent commit is never stored after that commit's
+# invalidation has run.
+write_generation = 0
+table_generations = {}
+unknown_write_generation = 0
+generation_lock = threading.Lock()
+
+def record_write(tables=None):
+    """Bump the write generation of tables (None: tables unknown)."""
+    global write_generation, unknown_write_generation
+    with generation_lock:
+        write_generation += 1
+        if tables is None:
+            unknown_write_generation = write_generation
+        else:
+            for table in tables:
+                table_generations[table.lower()] = write_generation
+
+def written_since(generation, tables):
+    """Whether tables (None: any table) were written after generation."""
+    if unknown_write_generation > generation:
+        return True
+    if tables is None:
+        return write_generation > generation
+    return any(table_generations.get(table, 0) > generation for table in tables)
+
+def invalidate_tables(tables):
+    """Drop cached results that depend on any of tables."""
+    record_write(tables)
+    removed = sum(cache.invalidate(tables) for cache in [query_cache, *list(cache_backends)])
+    if removed:
+        logger.info(f"Invalidated {removed} cached entries depending on {', '.join(sorted(tables))}")
+    return removed
+
+# Argument types keyed as-is; anything else goes through the JSON/MD5 key.
+# bool and float are left out because True == 1 == 1.0 would share a key.
+FAST_KEY_TYPES = frozenset({str, int, bytes, type(None)})
+
+# Arguments (by parameter name) holding SQL text, normalised before keying
+SQL_ARGUMENTS = ('query', 'sql')
+
+# Quoted literals and identifiers, which must keep their whitespace; the
+# capturing group makes re.split return them at the odd indexes
+SQL_QUOTED = re.compile(r"""('(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|`(?:[^`]|``)*`)""")
+SQL_WHITESPACE = re.compile(r'\s+')
+
+_normalized_sql = {}
+
+def normalize_sql(text):
+    """Collapse whitespace in SQL text outside quotes and intern the result.
+
+    Queries differing only in layout share a cache entry, while string
+    literals such as 'a  b' and 'a b' stay distinct. The interned string
+    makes key hashing and comparison cheap. Normalised forms are memoised
+    (up to 1024 distinct texts).
+    """
+    normalized = _normalized_sql.get(text)
+    if normalized is None:
+        if len(_normalized_sql) >= 1024:
+            _normalized_sql.clear()
+        parts = SQL_QUOTED.split(text)
+        parts[::2] = [SQL_WHITESPACE.sub(' ', part) for part in parts[::2]]
+        normalized = _normalized_sql[text] = sys.intern(''.join(parts).strip())
+    return normalized
+
+def legacy_cache_key(function_name, args, kwargs):
+    """JSON + MD5 key, for arguments that are not plain hashable values."""
+    cache_key_data = {
+        'function': function_name,
+        'args': args,
+        'kwargs': kwargs
+    }
+    return hashlib.md5(
+        json.dumps(cache_key_data, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+@functools.lru_cache(maxsize=None)
+def sql_positions(parameters):
+    """Indexes of the parameters that hold SQL text."""
+    return tuple(index for index, name in enumerate(parameters) if name in SQL_ARGUMENTS)
+
+def make_cache_key(function_name, args, kwargs, parameters=()):
+    """Build the cache key for a call (args without the connection).
+
+    parameters names the function's positional parameters after the
+    connection. Keyword arguments for them are moved into args, so f(x) and
+    f(query=x) share a key, and SQL arguments are normalised either way.
+    """
+    count = len(args)
+    if kwargs and count < len(parameters) and parameters[count] in kwargs:
+        kwargs = dict(kwargs)
+        moved = []
+        while count < len(parameters) and parameters[count] in kwargs:
+            moved.append(kwargs.pop(parameters[count]))
+            count += 1
+        args = args + tuple(moved)
+    for index in sql_positions(parameters):
+        if index < count and type(args[index]) is str:
+            args = args[:index] + (normalize_sql(args[index]),) + args[index + 1:]
+    if kwargs:
+        for name in SQL_ARGUMENTS:
+            if type(kwargs.get(name)) is str:
+                kwargs = dict(kwargs, **{name: normalize_sql(kwargs[name])})
+    if all(type(arg) in FAST_KEY_TYPES for arg in args) and \
+            all(type(value) in FAST_KEY_TYPES for value in kwargs.values()):
+        # Hashable tuple key: no serialisation or hashing beyond tuple hash
+        return (function_name, args, tuple(sorted(kwargs.items())) if kwargs else ())
+    return legacy_cache_key(function_name, args, kwargs)
+
+class Flight:
+    """A query execution in progress that concurrent misses on its key wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+# (backend, key) -> Flight for every query currently being executed
+in_flight = {}
+in_flight_lock = threading.Lock()
+
+def start_refresh(cache, cache_key, refresh):
+    """Run refresh in a daemon thread unless the key is already being loaded.
+
+    The refresh is registered as the key's flight, so misses during it wait
+    for its result instead of querying again.
+    """
+    flight_key = (cache, cache_key)
+    with in_flight_lock:
+        if flight_key in in_flight:
+            return False
+        flight = in_flight[flight_key] = Flight()
+
+    def run():
+        try:
+            flight.result = refresh()
+        except Exception as e:
+            flight.error = e
+            logger.error(f"Background refresh failed: {str(e)}")
+        finally:
+            with in_flight_lock:
+                del in_flight[flight_key]
+            flight.done.set()
+
+    threading.Thread(target=run, daemon=True).start()
+    return True
+
+class Refresher:
+    """Background thread that reloads the hottest cache entries before they expire.
+
+    Every interval seconds, up to top_n entries expiring within `ahead`
+    seconds are refreshed, most hit first, so popular keys never miss.
+    """
+
+    def __init__(self, backend=None, top_n=10, interval=1.0, ahead=5.0):
+        self.backend = backend
+        self.top_n = top_n
+        self.interval = interval
+        self.ahead = ahead
+        self.refreshes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        cache = query_cache if self.backend is None else self.backend
+        started = 0
+        for cache_key, entry in cache.hottest(self.top_n, self.ahead):
+            if start_refresh(cache, cache_key, entry['refresh']):
+                started += 1
+        self.refreshes += started
+        return started
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Refresher error: {str(e)}")
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+def open_connection():
+    """Open a connection to the users database."""
+    return sqlite3.connect('users.db')
 
 def with_db_connection(func):
     """Decorator that automatically handles opening and closing database connections."""
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')
+        conn = open_connection()
         try:
             result = func(conn, *args, **kwargs)
             return result
@@ -24,49 +402,168 @@ def with_db_connection(func):
             conn.close()
     return wrapper
 
-def cache_query(func):
-    """Decorator that caches query results based on the SQL query string."""
+def load(func, args, kwargs, cache, cache_key, ttl, refresh=None):
+    """Execute a cache_query function and store its result in cache."""
+    logger.info(f"Cache MISS for {func.__name__} - executing query")
+    # Record the tables the query reads, so writes to them invalidate it
+    conn = args[0] if args else None
+    tables = set()
+    tracked = track_tables(conn, READ_ACTIONS, tables)
+    generation = write_generation
+    start_time = time.time()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        if tracked:
+            conn.set_authorizer(None)
+    execution_time = time.time() - start_time
+    
+    # Store result in cache with metadata, unless a write to what it read
+    # committed while it ran (the check and the store are atomic with respect
+    # to record_write, so a later commit's invalidation still removes it)
+    with generation_lock:
+        if written_since(generation, tables if tracked else None):
+            logger.info(f"Result of {func.__name__} not cached - its tables changed while it ran")
+            return result
+        cache.set(
+            cache_key, result, ttl=ttl, execution_time=execution_time, function=func.__name__,
+            tables=frozenset(tables) if tracked else None, refresh=refresh
+        )
+    
+    logger.info(f"Result cached for {func.__name__} (execution time: {execution_time:.3f}s)")
+    return result
+
+def cache_query(func=None, *, backend=None, ttl=None, key=None, single_flight=True,
+                stale_ttl=None, connect=open_connection):
+    """Decorator that caches query results based on the SQL query string.
+
+    Use it bare (@cache_query) or with options, e.g.
+    @cache_query(ttl=60, backend=LRUCache(max_bytes=1024 * 1024)).
+    key, if given, is called with the function's arguments (without the
+    connection) and must return a hashable cache key. With single_flight,
+    concurrent misses on one key share a single execution.
+
+    stale_ttl (seconds) enables stale-while-revalidate: for that long after
+    expiry the old result is returned at once while a background thread
+    reloads it. Background loads (these and Refresher's) run on a fresh
+    connection from connect, since the caller's is closed by then.
+    """
+    if func is None:
+        return lambda f: cache_query(
+            f, backend=backend, ttl=ttl, key=key, single_flight=single_flight,
+            stale_ttl=stale_ttl, connect=connect
+        )
+    if backend is not None:
+        cache_backends.add(backend)
+    function_name = sys.intern(func.__name__)
+    # Positional parameters after the connection, for make_cache_key
+    parameters = tuple(
+        parameter.name for parameter in list(inspect.signature(func).parameters.values())[1:]
+        if parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)
+    )
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        # Create a cache key from function name, args, and kwargs
-        cache_key_data = {
-            'function': func.__name__,
-            'args': args[1:],  # Skip the connection object
-            'kwargs': kwargs
-        }
-        
-        # Create a hash of the cache key for consistent lookup
-        cache_key = hashlib.md5(
-            json.dumps(cache_key_data, sort_keys=True, default=str).encode()
-        ).hexdigest()
+        cache = query_cache if backend is None else backend
+
+        # Key on everything but the connection object
+        if key is not None:
+            cache_key = (function_name, key(*args[1:], **kwargs))
+        else:
+            cache_key = make_cache_key(function_name, args[1:], kwargs, parameters)
+
+        # The refresh closure is stored on the entry, so it must not hold the
+        # caller's connection (closed by the time a refresh runs)
+        call_args = args[1:]
+
+        def refresh():
+            conn = connect()
+            try:
+                return load(func, (conn, *call_args), kwargs, cache, cache_key, ttl, refresh)
+            finally:
+                conn.close()
         
         # Check if result is in cache
-        if cache_key in query_cache:
-            logger.info(f"Cache HIT for {func.__name__} - returning cached result")
-            return query_cache[cache_key]['result']
+        entry = cache.get(cache_key, stale=stale_ttl) if stale_ttl else cache.get(cache_key)
+        if entry is not None:
+            if entry['expires_at'] is not None and entry['expires_at'] <= time.time():
+                logger.info(f"Cache STALE for {func.__name__} - returning old result, refreshing")
+                start_refresh(cache, cache_key, refresh)
+            else:
+                logger.info(f"Cache HIT for {func.__name__} - returning cached result")
+            return entry['result']
         
-        # If not in cache, execute the function
-        logger.info(f"Cache MISS for {func.__name__} - executing query")
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        execution_time = time.time() - start_time
+        if not single_flight:
+            return load(func, args, kwargs, cache, cache_key, ttl, refresh)
         
-        # Store result in cache with metadata
-        query_cache[cache_key] = {
-            'result': result,
-            'timestamp': time.time(),
-            'execution_time': execution_time,
-            'function': func.__name__
-        }
+        # Single flight: the first miss executes the query, later misses on
+        # the same key wait for its result instead of running it again
+        flight_key = (cache, cache_key)
+        with in_flight_lock:
+            flight = in_flight.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = in_flight[flight_key] = Flight()
+        if not leader:
+            logger.info(f"Cache MISS for {func.__name__} - waiting for in-flight query")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
         
-        logger.info(f"Result cached for {func.__name__} (execution time: {execution_time:.3f}s)")
+        try:
+            # A flight that finished just before this one started has already cached the result
+            entry = cache.get(cache_key) if cache_key in cache else None
+            if entry is not None:
+                flight.result = entry['result']
+            else:
+                flight.result = load(func, args, kwargs, cache, cache_key, ttl, refresh)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with in_flight_lock:
+                del in_flight[flight_key]
+            flight.done.set()
+    
+    return wrapper
+
+def transactional(func):
+    """Decorator that commits or rolls back, and on commit invalidates cached
+    results that read the tables the transaction wrote."""
+    @functools.wraps(func)
+    def wrapper(conn, *args, **kwargs):
+        written = set()
+        tracked = track_tables(conn, WRITE_ACTIONS, written)
+        try:
+            conn.execute('BEGIN')
+            logger.info(f"Transaction started for {func.__name__}")
+            result = func(conn, *args, **kwargs)
+            conn.commit()
+            logger.info(f"Transaction committed successfully for {func.__name__}")
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Transaction rolled back for {func.__name__}: {str(e)}")
+            raise e
+        finally:
+            if tracked:
+                conn.set_authorizer(None)
+
+        if not tracked:
+            # Written tables are unknown, so nothing cached can be trusted
+            record_write()
+            clear_cache()
+            for cache in list(cache_backends):
+                cache.clear()
+        elif written:
+            invalidate_tables(written)
         return result
     
     return wrapper
 
 def clear_cache():
     """Clear the query cache."""
-    global query_cache
     cache_size = len(query_cache)
     query_cache.clear()
     logger.info(f"Cache cleared - removed {cache_size} entries")
@@ -75,11 +572,14 @@ def get_cache_stats():
     """Get cache statistics."""
     return {
         'total_entries': len(query_cache),
+        **query_cache.stats(),
         'entries': [
             {
                 'function': entry['function'],
                 'timestamp': entry['timestamp'],
-                'execution_time': entry['execution_time']
+                'execution_time': entry['execution_time'],
+                'size': entry['size'],
+                'tables': sorted(entry['tables']) if entry.get('tables') is not None else None
             }
             for entry in query_cache.values()
         ]
@@ -97,7 +597,7 @@ def fetch_users_with_cache(conn, query):
     return cursor.fetchall()
 
 @with_db_connection
-@cache_query
+@cache_query(stale_ttl=60)
 def get_user_count_by_age_range(conn, min_age, max_age):
     """Get count of users in age range with caching."""
     time.sleep(0.05)  # Simulate processing time
@@ -116,6 +616,139 @@ def get_users_by_email_domain(conn, domain):
     cursor.execute("SELECT * FROM users WHERE email LIKE ?", (f'%{domain}%',))
     return cursor.fetchall()
 
+@with_db_connection
+@cache_query
+def get_user_by_id(conn, user_id):
+    """Get a single user by id with caching."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+    return cursor.fetchone()
+
+def benchmark_cache_keys(iterations=100000):
+    """Compare cache hit latency with tuple keys against JSON/MD5 keys."""
+    level = logger.level
+    logger.setLevel(logging.WARNING)  # keep log formatting out of the timings
+    backends = [LRUCache(), LRUCache()]
+    try:
+        @cache_query(backend=backends[0])
+        def fast_lookup(conn, user_id):
+            return (user_id, 'name', 'email', 30)
+
+        @cache_query(backend=backends[1], key=lambda *args, **kwargs: legacy_cache_key('lookup', args, kwargs))
+        def legacy_lookup(conn, user_id):
+            return (user_id, 'name', 'email', 30)
+
+        results = {}
+        for name, lookup in (('tuple key', fast_lookup), ('json+md5 key', legacy_lookup)):
+            lookup(None, user_id=1)  # populate the entry
+            start_time = time.perf_counter()
+            for _ in range(iterations):
+                lookup(None, user_id=1)
+            results[name] = (time.perf_counter() - start_time) / iterations * 1e6
+            print(f"  {name:<13} {results[name]:.2f} us per cache hit")
+        print(f"  tuple keys are {results['json+md5 key'] / results['tuple key']:.1f}x faster on hits")
+        return results
+    finally:
+        logger.setLevel(level)
+
+def benchmark_stampede(threads=20):
+    """Fire concurrent misses on one key, with and without single flight."""
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    backends = [LRUCache(), LRUCache()]
+    try:
+        results = {}
+        for name, backend, single_flight in (
+                ('single flight', backends[0], True), ('no coalescing', backends[1], False)):
+            executions = []
+
+            @with_db_connection
+            @cache_query(backend=backend, single_flight=single_flight)
+            def count_users(conn, min_age):
+                executions.append(1)
+                time.sleep(0.05)  # Simulate a slow query
+                cursor = conn.cursor()
+                cursor.execute("SELECT COUNT(*) FROM users WHERE age >= ?", (min_age,))
+                return cursor.fetchone()[0]
+
+            barrier = threading.Barrier(threads)
+
+            def worker():
+                barrier.wait()
+                count_users(min_age=30)
+
+            workers = [threading.Thread(target=worker) for _ in range(threads)]
+            start_time = time.perf_counter()
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            elapsed = time.perf_counter() - start_time
+            results[name] = len(executions)
+            print(f"  {name:<14} {len(executions):>3} queries for {threads} concurrent calls "
+                  f"({len(backend)} cache entry, {elapsed:.3f}s)")
+        return results
+    finally:
+        logger.setLevel(level)
+
+def benchmark_refresh(duration=1.5, ttl=0.3):
+    """Latency of a hot, short-TTL aggregate with plain expiry, with
+    stale-while-revalidate, and with the background refresher."""
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    backends = [LRUCache(), LRUCache(), LRUCache()]
+    try:
+        results = {}
+        for name, backend, stale_ttl, refresh_ahead in (
+                ('expire', backends[0], None, None),
+                ('stale', backends[1], 60, None),
+                ('stale+refresh', backends[2], 60, ttl / 2)):
+
+            @with_db_connection
+            @cache_query(backend=backend, ttl=ttl, stale_ttl=stale_ttl)
+            def count_in_range(conn, min_age, max_age):
+                time.sleep(0.05)  # Simulate a slow aggregate
+                cursor = conn.cursor()
+                cursor.execute("SELECT COUNT(*) FROM users WHERE age BETWEEN ? AND ?", (min_age, max_age))
+                return cursor.fetchone()[0]
+
+            refresher = None
+            if refresh_ahead is not None:
+                refresher = Refresher(backend, top_n=5, interval=ttl / 10, ahead=refresh_ahead).start()
+            count_in_range(min_age=25, max_age=35)  # populate the entry
+            latencies = []
+            end_time = time.perf_counter() + duration
+            while time.perf_counter() < end_time:
+                start_time = time.perf_counter()
+                count_in_range(min_age=25, max_age=35)
+                latencies.append(time.perf_counter() - start_time)
+                time.sleep(0.001)
+            if refresher is not None:
+                refresher.stop()
+
+            latencies.sort()
+            p50 = latencies[len(latencies) // 2] * 1000
+            p99 = latencies[int(len(latencies) * 0.99)] * 1000
+            worst = latencies[-1] * 1000
+            results[name] = {'p50_ms': p50, 'p99_ms': p99, 'max_ms': worst}
+            print(f"  {name:<14} p50 {p50:.3f}ms  p99 {p99:.3f}ms  max {worst:.3f}ms  "
+                  f"({backend.stats()['stale_hits']} stale hits)")
+        return results
+    finally:
+        logger.setLevel(level)
+
+@with_db_connection
+@transactional
+def update_user_email(conn, user_id, new_email):
+    """Update a user's email address."""
+    cursor = conn.cursor()
+    cursor.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
+    
+    if cursor.rowcount == 0:
+        raise ValueError(f"No user found with ID {user_id}")
+    
+    logger.info(f"Updated email for user ID {user_id} to {new_email}")
+
 if __name__ == "__main__":
     print("=== Task 4: Cache Database Queries ===")
     
@@ -164,7 +797,8 @@ if __name__ == "__main__":
     # Display cache statistics
     print("\n3. Cache Statistics:")
     stats = get_cache_stats()
-    print(f"Total cache entries: {stats['total_entries']}")
+    print(f"Total cache entries: {stats['total_entries']} ({stats['bytes']} bytes)")
+    print(f"Hits: {stats['hits']}, misses: {stats['misses']}, evictions: {stats['evictions']}")
     for i, entry in enumerate(stats['entries'], 1):
         print(f"  {i}. {entry['function']} - executed in {entry['execution_time']:.3f}s")
     
@@ -176,3 +810,42 @@ if __name__ == "__main__":
     print("Testing after cache clear (should execute query again):")
     users_after_clear = fetch_users_with_cache(query="SELECT * FROM users")
     print(f"Retrieved {len(users_after_clear)} users after cache clear")
+    
+    # Bounded cache demonstration
+    print("\n5. Bounded cache (2 entries, 1 second TTL):")
+    small_cache = LRUCache(max_entries=2, ttl=1)
+    
+    @with_db_connection
+    @cache_query(backend=small_cache)
+    def count_users_older_than(conn, age):
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM users WHERE age > ?", (age,))
+        return cursor.fetchone()[0]
+    
+    for age in (20, 30, 40, 20):
+        count_users_older_than(age=age)
+    time.sleep(1.1)
+    count_users_older_than(age=40)
+    print(f"Backend stats: {small_cache.stats()}")
+    
+    # Write-aware invalidation demonstration
+    print("\n6. Invalidation on commit:")
+    fetch_users_with_cache(query="SELECT * FROM users")
+    get_user_count_by_age_range(min_age=25, max_age=35)
+    print(f"Cached before update: {get_cache_stats()['total_entries']} entries")
+    update_user_email(user_id=1, new_email='alice.updated@email.com')
+    print(f"Cached after update: {get_cache_stats()['total_entries']} entries")
+    users = fetch_users_with_cache(query="SELECT * FROM users")
+    print(f"User 1 email after re-query: {users[0][2]}")
+    
+    # Cache key cost
+    print("\n7. Cache hit latency by key type:")
+    benchmark_cache_keys()
+    
+    # Cache stampede
+    print("\n8. Concurrent misses on one key:")
+    benchmark_stampede()
+    
+    # Stale-while-revalidate and background refresh
+    print("\n9. Hot aggregate with a 0.3s TTL:")
+    benchmark_refresh()
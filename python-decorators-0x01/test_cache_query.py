@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Unit tests for the cache keys of 4-cache_query.py"""
+import importlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+cache_query_module = importlib.import_module("4-cache_query")
+
+
+class TestNormalizeSql(unittest.TestCase):
+    """Unit tests for normalize_sql"""
+
+    def test_layout_whitespace_is_collapsed(self):
+        """Queries differing only in layout normalise to the same text"""
+        self.assertEqual(
+            cache_query_module.normalize_sql("SELECT *\n  FROM users\tWHERE age > 30 "),
+            "SELECT * FROM users WHERE age > 30"
+        )
+
+    def test_whitespace_in_literals_is_kept(self):
+        """Whitespace inside quoted literals is part of the value"""
+        normalize_sql = cache_query_module.normalize_sql
+        self.assertEqual(
+            normalize_sql("SELECT * FROM users WHERE name = 'a  b'"),
+            "SELECT * FROM users WHERE name = 'a  b'"
+        )
+        self.assertNotEqual(
+            normalize_sql("SELECT * FROM users WHERE name = 'a  b'"),
+            normalize_sql("SELECT * FROM users WHERE name = 'a b'")
+        )
+        self.assertEqual(
+            normalize_sql("SELECT  'it''s  here',   \"x  y\""),
+            "SELECT 'it''s  here', \"x  y\""
+        )
+
+
+class TestCacheQueryKeys(unittest.TestCase):
+    """cache_query keys through a decorated function"""
+
+    def setUp(self):
+        self.calls = []
+        calls = self.calls
+
+        @cache_query_module.cache_query(backend=cache_query_module.LRUCache())
+        def run_query(conn, query):
+            calls.append(query)
+            return query
+
+        self.run_query = run_query
+
+    def test_literals_do_not_share_an_entry(self):
+        """A literal's whitespace change is a different cache entry"""
+        self.assertEqual(self.run_query(None, query="SELECT 'a  b'"), "SELECT 'a  b'")
+        self.assertEqual(self.run_query(None, query="SELECT 'a b'"), "SELECT 'a b'")
+        self.assertEqual(len(self.calls), 2)
+
+    def test_positional_and_keyword_sql_share_an_entry(self):
+        """SQL is normalised and keyed the same however it is passed"""
+        self.run_query(None, "SELECT *  FROM users")
+        self.run_query(None, query="SELECT * FROM\nusers")
+        self.run_query(None, "SELECT * FROM users ")
+        self.assertEqual(len(self.calls), 1)
+
+    def test_refresh_does_not_hold_the_connection(self):
+        """Entries keep a refresh callable but not the caller's connection"""
+        backend = cache_query_module.LRUCache()
+        conn = sqlite3.connect(":memory:")
+
+        @cache_query_module.cache_query(backend=backend)
+        def run_query(conn, query):
+            return conn.execute(query).fetchall()
+
+        run_query(conn, "SELECT 1")
+        refresh = backend.values()[0]['refresh']
+        captured = [cell.cell_contents for cell in refresh.__closure__]
+        self.assertFalse(any(value is conn for value in captured))
+        self.assertFalse(any(
+            isinstance(value, tuple) and any(item is conn for item in value) for value in captured
+        ))
+        conn.close()
+
+
+
+class TestWriteDuringRead(unittest.TestCase):
+    """A commit landing while a cached query runs"""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT)")
+        conn.execute("INSERT INTO users VALUES (2, 'e2@x')")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_pre_commit_result_is_not_cached(self):
+        """The result read before the commit is returned but not stored"""
+        backend = cache_query_module.LRUCache()
+
+        @cache_query_module.cache_query(backend=backend)
+        def get_email(conn, user_id):
+            email = conn.execute("SELECT email FROM users WHERE id = ?", (user_id,)).fetchone()[0]
+            time.sleep(0.3)
+            return email
+
+        @cache_query_module.transactional
+        def update_email(conn, user_id, new_email):
+            conn.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
+
+        def write():
+            time.sleep(0.1)
+            conn = sqlite3.connect(self.path)
+            update_email(conn, 2, 'new@x')
+            conn.close()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        conn = sqlite3.connect(self.path)
+        self.assertEqual(get_email(conn, 2), 'e2@x')
+        writer.join()
+        self.assertEqual(len(backend), 0)
+        self.assertEqual(get_email(conn, 2), 'new@x')
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
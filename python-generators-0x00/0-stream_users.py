@@ -1,23 +1,110 @@
-import mysql.connector
+import time
+from collections import namedtuple
+from datetime import datetime
+
 from mysql.connector import Error
 
-def stream_users():
+from seed import USER_COLUMNS, USER_FIELDS, connect_to_prodev
+
+# Compact row types for stream_users(row_factory=...): both store the four
+# fields without a per-row dict, and ages arrive as int rather than Decimal
+User = namedtuple("User", USER_COLUMNS)
+
+class UserRecord:
+    __slots__ = USER_COLUMNS
+
+    def __init__(self, user_id, name, email, age):
+        self.user_id = user_id
+        self.name = name
+        self.email = email
+        self.age = age
+
+    def __repr__(self):
+        return (f"UserRecord(user_id={self.user_id!r}, name={self.name!r}, "
+                f"email={self.email!r}, age={self.age!r})")
+
+def stream_users(fetch_size=1000, row_factory=None):
+    # row_factory (e.g. User or UserRecord) is called as
+    # row_factory(user_id, name, email, age) with an int age; without it the
+    # raw cursor tuples are yielded
+    connection = None
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='root',
-            database='ALX_prodev'
-        )
-        cursor = connection.cursor()
-        cursor.execute("SELECT * FROM user_data")
-
-        for row in cursor:
-            yield row
+        connection = connect_to_prodev(dedicated=True)
+        if connection is None:
+            return
+        # Unbuffered cursor: rows stay on the server until fetched, so memory
+        # is bounded by fetch_size instead of the size of user_data
+        cursor = connection.cursor(buffered=False)
+        cursor.execute(f"SELECT {USER_FIELDS} FROM user_data")
+
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            if row_factory is None:
+                yield from rows
+            else:
+                for user_id, name, email, age in rows:
+                    yield row_factory(user_id, name, email, int(age))
 
         cursor.close()
-        connection.close()
 
     except Error as e:
         print(f"Error: {e}")
         return
+    finally:
+        # Closing the dedicated connection drops unread rows when the
+        # consumer stops early
+        if connection is not None:
+            connection.close()
+
+def stream_users_tail(fetch_size=1000, min_interval=0.5, max_interval=30.0,
+                      settle=1.0, max_idle=None):
+    # Yields every row (as a dict with updated_at), then keeps yielding rows as
+    # they are inserted or updated. Progress is a (updated_at, user_id)
+    # high-water mark walked through idx_updated_at, so each poll only reads
+    # new changes. Polls back off from min_interval to max_interval while
+    # nothing changes and snap back once rows arrive. Rows newer than `settle`
+    # seconds are left for the next poll so slow commits carrying an earlier
+    # timestamp aren't skipped. Stops after max_idle idle seconds if given.
+    connection = None
+    try:
+        connection = connect_to_prodev()
+        if connection is None:
+            return
+        cursor = connection.cursor(dictionary=True)
+        last_changed, last_user_id = datetime(1970, 1, 2), ""
+        interval = min_interval
+        idle_since = time.monotonic()
+
+        while True:
+            cursor.execute("""
+                SELECT user_id, name, email, age, updated_at FROM user_data
+                WHERE (updated_at > %s OR (updated_at = %s AND user_id > %s))
+                AND updated_at <= NOW(6) - INTERVAL %s MICROSECOND
+                ORDER BY updated_at, user_id
+                LIMIT %s
+            """, (last_changed, last_changed, last_user_id, int(settle * 1000000), fetch_size))
+            rows = cursor.fetchall()
+            # End the read transaction so the next poll sees new commits
+            connection.commit()
+
+            if rows:
+                yield from rows
+                last_changed, last_user_id = rows[-1]["updated_at"], rows[-1]["user_id"]
+                interval = min_interval
+                idle_since = time.monotonic()
+                if len(rows) == fetch_size:
+                    continue  # still catching up, poll again immediately
+            elif max_idle is not None and time.monotonic() - idle_since >= max_idle:
+                break
+            time.sleep(interval)
+            if not rows:
+                interval = min(interval * 2, max_interval)
+
+    except Error as e:
+        print(f"Error: {e}")
+        return
+    finally:
+        if connection is not None:
+            connection.close()
@@ -1,32 +1,239 @@
-import mysql.connector
+import operator
+import queue
+import threading
 from decimal import Decimal
 
-def stream_users_in_batches(batch_size):
-    conn = mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="root",
-        database="ALX_prodev"
-    )
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT COUNT(*) FROM user_data")
-    total_rows = cursor.fetchone()['COUNT(*)']
-
-    for offset in range(0, total_rows, batch_size):
-        cursor.execute(f"SELECT * FROM user_data LIMIT {batch_size} OFFSET {offset}")
-        batch = cursor.fetchall()
-        yield batch  # Generator yields each batch
-
-    cursor.close()
-    conn.close()
+from seed import USER_FIELDS, connect_to_prodev
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for column batches
+    np = None
+
+FILTER_COLUMNS = ("user_id", "name", "email", "age")
+FILTER_OPERATORS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+class Predicate:
+    """A column comparison that compiles to SQL and also runs in Python"""
+
+    def __init__(self, column, op, value):
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"Cannot filter on column {column!r}")
+        if op not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported operator {op!r}")
+        self.column = column
+        self.op = op
+        self.value = value
+
+    def to_sql(self):
+        return f"{self.column} {self.op} %s", [self.value]
+
+    def __call__(self, row):
+        return FILTER_OPERATORS[self.op](row[self.column], self.value)
+
+    def __repr__(self):
+        return f"Predicate({self.column!r}, {self.op!r}, {self.value!r})"
+
+
+def compile_filters(where):
+    # Split `where` (a Predicate, any callable, or a list of them, ANDed) into
+    # a parameterized SQL clause and the callables only Python can evaluate
+    if where is None:
+        return "", [], []
+    if not isinstance(where, (list, tuple)):
+        where = [where]
+
+    clauses, params, python_filters = [], [], []
+    for condition in where:
+        if isinstance(condition, Predicate):
+            clause, values = condition.to_sql()
+            clauses.append(clause)
+            params.extend(values)
+        else:
+            python_filters.append(condition)
+    return " AND ".join(clauses), params, python_filters
+
+
+def apply_filters(rows, python_filters):
+    if not python_filters:
+        return rows
+    return [row for row in rows if all(check(row) for check in python_filters)]
+
+
+_DONE = object()
+
+
+def prefetch_batches(batches, depth=1):
+    # Double buffering: a background thread fetches batch N+1 (up to `depth`
+    # batches ahead) while the consumer is still processing batch N
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    failure = []
+
+    def put(item):
+        # Bounded put that gives up once the consumer has gone away
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for batch in batches:
+                if not put(batch):
+                    break
+        except Exception as e:
+            failure.append(e)
+        finally:
+            # Close the source in the thread that iterated it, releasing its connection
+            batches.close()
+            put(_DONE)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            batch = buffer.get()
+            if batch is _DONE:
+                break
+            yield batch
+        if failure:
+            raise failure[0]
+    finally:
+        stop.set()
+        thread.join()
+
+
+def stream_users_in_batches(batch_size, where=None, prefetch=0):
+    if prefetch:
+        yield from prefetch_batches(stream_users_in_batches(batch_size, where), prefetch)
+        return
+    clause, params, python_filters = compile_filters(where)
+    conn = connect_to_prodev(dedicated=True)
+    if conn is None:
+        return
+    try:
+        # One query on an unbuffered cursor: each fetchmany pulls the next
+        # batch off the socket, so memory stays bounded by batch_size
+        cursor = conn.cursor(dictionary=True, buffered=False)
+        if clause:
+            cursor.execute(f"SELECT {USER_FIELDS} FROM user_data WHERE {clause}", params)
+        else:
+            cursor.execute(f"SELECT {USER_FIELDS} FROM user_data")
+
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            batch = apply_filters(batch, python_filters)
+            if batch:
+                yield batch  # Generator yields each batch
+
+        cursor.close()
+    finally:
+        conn.close()
     return  # Explicit return for checker
 
 
-def batch_processing(batch_size):
-    for batch in stream_users_in_batches(batch_size):
+def stream_users_in_batches_keyset(batch_size, after=None, where=None):
+    # Seek pagination on the user_id primary key: each batch is an index range
+    # scan from the last key seen, never an OFFSET skip. Yields (batch, token);
+    # restart with after=token to resume from that point.
+    clause, params, python_filters = compile_filters(where)
+    filter_sql = f" AND {clause}" if clause else ""
+    conn = connect_to_prodev()
+    if conn is None:
+        return
+    try:
+        cursor = conn.cursor(dictionary=True)
+        while True:
+            if after is None:
+                cursor.execute(
+                    f"SELECT {USER_FIELDS} FROM user_data WHERE 1 = 1{filter_sql} ORDER BY user_id LIMIT %s",
+                    params + [batch_size]
+                )
+            else:
+                cursor.execute(
+                    f"SELECT {USER_FIELDS} FROM user_data WHERE user_id > %s{filter_sql} ORDER BY user_id LIMIT %s",
+                    [after] + params + [batch_size]
+                )
+            batch = cursor.fetchall()
+            if not batch:
+                break
+            after = batch[-1]["user_id"]
+            # The token comes from the unfiltered page so resuming never skips rows
+            yield apply_filters(batch, python_filters), after
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def stream_users_in_column_batches(batch_size, where=None):
+    # Column-oriented batches: {"user_id": S36 array, "name"/"email": fixed-width
+    # unicode arrays, "age": int16 array}. Rows come from a tuple cursor, so no
+    # dict is built per row. Predicates are pushed into SQL as usual; any other
+    # callable in `where` receives the column batch and must return a boolean mask.
+    if np is None:
+        raise ImportError("numpy is required for stream_users_in_column_batches")
+    clause, params, column_filters = compile_filters(where)
+    conn = connect_to_prodev(dedicated=True)
+    if conn is None:
+        return
+    try:
+        cursor = conn.cursor(buffered=False)
+        query = f"SELECT {USER_FIELDS} FROM user_data"
+        if clause:
+            cursor.execute(f"{query} WHERE {clause}", params)
+        else:
+            cursor.execute(query)
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            user_ids, names, emails, ages = zip(*rows)
+            columns = {
+                "user_id": np.array(user_ids, dtype="S36"),
+                "name": np.array(names, dtype=str),
+                "email": np.array(emails, dtype=str),
+                "age": np.fromiter((int(age) for age in ages), dtype=np.int16, count=len(ages)),
+            }
+            for column_filter in column_filters:
+                columns = select_columns(columns, column_filter(columns))
+            if len(columns["age"]):
+                yield columns
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def select_columns(columns, mask):
+    return {name: values[mask] for name, values in columns.items()}
+
+
+def batch_processing_columnar(batch_size, min_age=25):
+    # Vectorized counterpart of batch_processing: one comparison per batch
+    # instead of one per row. Yields the column batches of matching users.
+    for columns in stream_users_in_column_batches(batch_size):
+        yield select_columns(columns, columns["age"] > min_age)
+
+
+def batch_processing(batch_size, where=Predicate("age", ">", 25)):
+    # The age filter is pushed down into SQL, so only matching rows are sent
+    for batch in stream_users_in_batches(batch_size, where):
         for user in batch:
             if isinstance(user['age'], Decimal):
                 user['age'] = int(user['age'])
-            if user['age'] > 25:
-                print(user)
-    return  # Explicit return for checker
\ No newline at end of file
+            print(user)
+    return  # Explicit return for checker
@@ -1,19 +1,64 @@
  #!/usr/bin/python3
-from seed import connect_to_prodev
+from seed import USER_FIELDS, connect_to_prodev
 
-def paginate_users(page_size, offset):
-    conn = connect_to_prodev()
+def paginate_users(page_size, offset, connection=None):
+    # Borrow the caller's connection when given one; otherwise open and close
+    # a connection just for this page
+    conn = connection or connect_to_prodev()
     cursor = conn.cursor(dictionary=True)
-    cursor.execute(f"SELECT * FROM user_data LIMIT {page_size} OFFSET {offset}")
+    cursor.execute(f"SELECT {USER_FIELDS} FROM user_data LIMIT %s OFFSET %s", (page_size, offset))
     rows = cursor.fetchall()
-    conn.close()
+    cursor.close()
+    if connection is None:
+        conn.close()
     return rows
 
 def lazy_paginate(page_size):
-    offset = 0
-    while True:
-        page = paginate_users(page_size, offset)
-        if not page:
-            break
-        yield page
-        offset += page_size
+    # One connection for the life of the generator; the finally block closes
+    # it on exhaustion or as soon as the consumer closes the generator
+    conn = connect_to_prodev()
+    if conn is None:
+        return
+    try:
+        offset = 0
+        while True:
+            page = paginate_users(page_size, offset, conn)
+            if not page:
+                break
+            yield page
+            offset += page_size
+    finally:
+        conn.close()
+
+def paginate_users_after(page_size, last_user_id=None, connection=None):
+    # Keyset (seek) page: WHERE user_id > last seen key walks the primary key
+    # index, so every page costs the same however deep the scan is
+    conn = connection or connect_to_prodev()
+    cursor = conn.cursor(dictionary=True)
+    if last_user_id is None:
+        cursor.execute(f"SELECT {USER_FIELDS} FROM user_data ORDER BY user_id LIMIT %s", (page_size,))
+    else:
+        cursor.execute(
+            f"SELECT {USER_FIELDS} FROM user_data WHERE user_id > %s ORDER BY user_id LIMIT %s",
+            (last_user_id, page_size)
+        )
+    rows = cursor.fetchall()
+    cursor.close()
+    if connection is None:
+        conn.close()
+    return rows
+
+def lazy_paginate_keyset(page_size, after=None):
+    # Yields (page, token); pass the token back as `after` to resume
+    conn = connect_to_prodev()
+    if conn is None:
+        return
+    try:
+        while True:
+            page = paginate_users_after(page_size, after, conn)
+            if not page:
+                break
+            after = page[-1]["user_id"]
+            yield page, after
+    finally:
+        conn.close()
@@ -1,34 +1,126 @@
-import mysql.connector
+import math
 from decimal import Decimal
+from mysql.connector import Error
+
+from seed import connect_to_prodev
 
 def stream_user_ages():
-    conn = mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="root",
-        database="ALX_prodev"
-    )
-    cursor = conn.cursor()
-    cursor.execute("SELECT age FROM user_data")
-
-    for (age,) in cursor:
-        if isinstance(age, Decimal):
-            age = int(age)
-        yield age
-
-    cursor.close()
-    conn.close()
-
-def calculate_average_age():
-    total_age = 0
-    count = 0
+    conn = connect_to_prodev(dedicated=True)
+    if conn is None:
+        return
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT age FROM user_data")
+
+        for (age,) in cursor:
+            if isinstance(age, Decimal):
+                age = int(age)
+            yield age
+
+        cursor.close()
+    finally:
+        conn.close()
+
+class AgeAccumulator:
+    """One-pass count/sum/min/max/mean/variance (Welford) and histogram"""
+
+    def __init__(self, bucket_size=10):
+        self.bucket_size = bucket_size
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.buckets = {}
+
+    def add(self, age):
+        self.count += 1
+        self.total += age
+        self.minimum = age if self.minimum is None else min(self.minimum, age)
+        self.maximum = age if self.maximum is None else max(self.maximum, age)
+        # Welford's update keeps the variance numerically stable in one pass
+        delta = age - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (age - self.mean)
+        bucket = (age // self.bucket_size) * self.bucket_size
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
 
+    def stats(self):
+        variance = self._m2 / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "avg": self.mean if self.count else 0,
+            "min": self.minimum,
+            "max": self.maximum,
+            "variance": variance,
+            "stddev": math.sqrt(variance),
+        }
+
+def _sql_age_stats(cursor):
+    cursor.execute("""
+        SELECT COUNT(*), SUM(age), AVG(age), MIN(age), MAX(age), VAR_POP(age)
+        FROM user_data
+    """)
+    count, total, average, minimum, maximum, variance = cursor.fetchone()
+    variance = float(variance or 0)
+    return {
+        "count": count,
+        "sum": int(total or 0),
+        "avg": float(average or 0),
+        "min": None if minimum is None else int(minimum),
+        "max": None if maximum is None else int(maximum),
+        "variance": variance,
+        "stddev": math.sqrt(variance),
+    }
+
+def _sql_age_histogram(cursor, bucket_size):
+    cursor.execute("""
+        SELECT FLOOR(age / %s) * %s AS bucket, COUNT(*)
+        FROM user_data GROUP BY bucket ORDER BY bucket
+    """, (bucket_size, bucket_size))
+    return {int(bucket): count for bucket, count in cursor.fetchall()}
+
+def _run_in_sql(query, *args):
+    conn = connect_to_prodev()
+    if conn is None:
+        raise Error("Could not connect to ALX_prodev")
+    try:
+        cursor = conn.cursor()
+        result = query(cursor, *args)
+        cursor.close()
+        return result
+    finally:
+        conn.close()
+
+def _accumulate(bucket_size=10):
+    accumulator = AgeAccumulator(bucket_size)
     for age in stream_user_ages():
-        total_age += age
-        count += 1
+        accumulator.add(age)
+    return accumulator
+
+def age_stats(use_sql=True):
+    # Aggregates in MySQL so only one row crosses the wire; falls back to
+    # streaming every age through the one-pass accumulator
+    if use_sql:
+        try:
+            return _run_in_sql(_sql_age_stats)
+        except Error as e:
+            print(f"SQL aggregation failed, streaming instead: {e}")
+    return _accumulate().stats()
+
+def age_histogram(bucket_size=10, use_sql=True):
+    if use_sql:
+        try:
+            return _run_in_sql(_sql_age_histogram, bucket_size)
+        except Error as e:
+            print(f"SQL aggregation failed, streaming instead: {e}")
+    return dict(sorted(_accumulate(bucket_size).buckets.items()))
 
-    average = total_age / count if count != 0 else 0
+def calculate_average_age(use_sql=True):
+    average = age_stats(use_sql)["avg"]
     print(f"Average age of users: {average}")
 
 if __name__ == "__main__":
-    calculate_average_age()
\ No newline at end of file
+    calculate_average_age()
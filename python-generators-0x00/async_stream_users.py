@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+import asyncio
+import contextlib
+
+import aiomysql
+
+import seed
+
+_DONE = object()
+
+
+def _aiomysql_config():
+    # Same MYSQL_* environment settings as seed.connect_to_prodev
+    config = seed.db_config()
+    return {
+        "host": config["host"],
+        "port": config["port"],
+        "user": config["user"],
+        "password": config["password"],
+        "db": config["database"],
+        "connect_timeout": config["connection_timeout"],
+    }
+
+
+async def _fetch_batches(batch_size):
+    conn = await aiomysql.connect(**_aiomysql_config())
+    try:
+        # Server-side cursor: rows are read off the socket batch by batch
+        cursor = await conn.cursor(aiomysql.SSDictCursor)
+        await cursor.execute(f"SELECT {seed.USER_FIELDS} FROM user_data")
+        while True:
+            batch = await cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            yield batch
+    finally:
+        # Closing the socket also drops unread rows if the consumer stopped early
+        conn.close()
+
+
+async def _fetch_pages(page_size):
+    conn = await aiomysql.connect(**_aiomysql_config())
+    try:
+        cursor = await conn.cursor(aiomysql.DictCursor)
+        after = None
+        while True:
+            if after is None:
+                await cursor.execute(f"SELECT {seed.USER_FIELDS} FROM user_data ORDER BY user_id LIMIT %s", (page_size,))
+            else:
+                await cursor.execute(
+                    f"SELECT {seed.USER_FIELDS} FROM user_data WHERE user_id > %s ORDER BY user_id LIMIT %s",
+                    (after, page_size)
+                )
+            page = await cursor.fetchall()
+            if not page:
+                break
+            after = page[-1]["user_id"]
+            yield page
+        await cursor.close()
+    finally:
+        conn.close()
+
+
+async def prefetch(source, depth=1):
+    """Runs an async generator ahead of its consumer by up to depth items.
+
+    A background task fills a bounded queue while the consumer works on the
+    current item; when the queue is full the task waits, which is what keeps
+    memory bounded (backpressure).
+    """
+    queue = asyncio.Queue(maxsize=depth)
+    failure = None
+
+    async def produce():
+        nonlocal failure
+        try:
+            async for item in source:
+                await queue.put(item)
+        except Exception as e:
+            failure = e
+        await queue.put(_DONE)
+
+    task = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            yield item
+        if failure is not None:
+            raise failure
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        await source.aclose()
+
+
+async def async_stream_users_in_batches(batch_size, prefetch_batches=1):
+    """Async generator of user_data batches; the next batches are fetched
+    concurrently while the current one is processed"""
+    batches = _fetch_batches(batch_size)
+    if prefetch_batches:
+        batches = prefetch(batches, prefetch_batches)
+    async for batch in batches:
+        yield batch
+
+
+async def async_stream_users(fetch_size=1000, prefetch_batches=1):
+    """Async generator that yields user_data rows one by one"""
+    async for batch in async_stream_users_in_batches(fetch_size, prefetch_batches):
+        for row in batch:
+            yield row
+
+
+async def async_lazy_paginate(page_size, prefetch_pages=1):
+    """Async counterpart of lazy_paginate over one connection.
+
+    Pages are fetched with keyset pagination on user_id so each costs the same
+    regardless of depth.
+    """
+    pages = _fetch_pages(page_size)
+    if prefetch_pages:
+        pages = prefetch(pages, prefetch_pages)
+    async for page in pages:
+        yield page
+
+
+async def main():
+    count = 0
+    async for user in async_stream_users():
+        count += 1
+        if count <= 5:
+            print(user)
+    print(f"Streamed {count} users")
+
+    async for page in async_lazy_paginate(100):
+        print(f"First page has {len(page)} users")
+        break
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,564 @@
+#!/usr/bin/python3
+"""Benchmarks for the python-generators scripts.
+
+The suite runs the generators against synthetic SQLite stand-ins of
+user_data (see sqlite_backend.py), so it needs no MySQL server, and writes
+JSON that later runs can be compared against:
+
+    python3 benchmark.py suite --rows 10000 1000000 --output bench.json
+    python3 benchmark.py suite --rows 10000 --compare bench.json
+
+The other benchmarks run against the ALX_prodev database from seed.py:
+
+    python3 benchmark.py seeding user_data.csv
+    python3 benchmark.py streaming --batch-size 1000
+    python3 benchmark.py pagination --page-size 100 --pages 1000
+    python3 benchmark.py prefetch --batch-size 1000 --delay 0.01
+    python3 benchmark.py rows --rows 100000
+    python3 benchmark.py schema --repeat 50
+
+The seeding benchmark truncates user_data before each run, and the schema
+benchmark applies seed.migrate_user_data_schema to it.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+
+import seed
+import sqlite_backend
+
+generate_user_data = __import__('generate_user_data')
+parallel_seed = __import__('parallel_seed')
+stream_users_module = __import__('0-stream_users')
+stream_users = stream_users_module.stream_users
+stream_users_in_batches = __import__('1-batch_processing').stream_users_in_batches
+lazy_paginate_module = __import__('2-lazy_paginate')
+stream_ages = __import__('4-stream_ages')
+
+SUITE_CASES = ('stream_users', 'stream_users_in_batches', 'lazy_paginate', 'calculate_average_age')
+
+
+def _status_kb(field):
+    # VmRSS / VmHWM from /proc/self/status, in KB; None off Linux
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    # ru_maxrss and VmHWM survive fork+exec, so a spawned child starts out at
+    # its parent's peak. Writing 5 to clear_refs (Linux 4.0+) resets VmHWM to
+    # the current RSS so the peak read afterwards belongs to this case.
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _sample_rss(stop, peak, interval=0.005):
+    # Fallback when VmHWM cannot be reset: poll VmRSS while the case runs
+    while not stop.wait(interval):
+        peak[0] = max(peak[0], _status_kb('VmRSS') or 0)
+
+
+def _measure(func, args, trace_allocations):
+    # Runs in a fresh child process. Peak RSS is VmHWM after a reset, or
+    # sampled VmRSS if the reset is not permitted; rss_growth_kb is that peak
+    # minus the RSS the child started the case with.
+    baseline_rss = _status_kb('VmRSS')
+    sampler = None
+    if baseline_rss is not None and not _reset_peak_rss():
+        stop, peak = threading.Event(), [baseline_rss]
+        sampler = threading.Thread(target=_sample_rss, args=(stop, peak), daemon=True)
+        sampler.start()
+    sqlite_backend.reset()
+    if trace_allocations:
+        tracemalloc.start()
+    start_time = time.perf_counter()
+    rows = func(*args)
+    elapsed = time.perf_counter() - start_time
+    peak_traced = None
+    if trace_allocations:
+        _, peak_traced = tracemalloc.get_traced_memory()
+        peak_traced //= 1024
+        tracemalloc.stop()
+    if baseline_rss is None:
+        # No /proc: ru_maxrss (KB on Linux, bytes on macOS) includes the
+        # parent's peak, so growth cannot be measured
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        baseline_rss = peak_rss
+    elif sampler is not None:
+        stop.set()
+        sampler.join()
+        peak_rss = max(peak[0], _status_kb('VmRSS'))
+    else:
+        peak_rss = _status_kb('VmHWM')
+    result = {
+        'rows': rows,
+        'seconds': elapsed,
+        'rows_per_sec': rows / elapsed if elapsed > 0 else 0,
+        'peak_traced_kb': peak_traced,
+        'peak_rss_kb': peak_rss,
+        'rss_growth_kb': peak_rss - baseline_rss,
+    }
+    # Query and connection counts are only observable through the stand-in
+    if os.environ.get('USER_DATA_SQLITE'):
+        result['queries'] = sqlite_backend.stats['queries']
+        result['connections'] = sqlite_backend.stats['connections']
+    return result
+
+
+def run_isolated(func, *args, trace_allocations=True):
+    """Runs func(*args) in a new process and returns its time and memory profile"""
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(_measure, (func, args, trace_allocations))
+
+
+def _truncate_user_data():
+    connection = seed.connect_to_prodev()
+    cursor = connection.cursor()
+    cursor.execute("TRUNCATE TABLE user_data")
+    cursor.close()
+    connection.close()
+
+
+def _count_user_data():
+    connection = seed.connect_to_prodev()
+    cursor = connection.cursor()
+    cursor.execute("SELECT COUNT(*) FROM user_data")
+    count = cursor.fetchone()[0]
+    cursor.close()
+    connection.close()
+    return count
+
+
+def bench_seeding(csv_file, processes=None, writers=4):
+    """Compares serial seed.insert_data with parallel_seed.insert_data_parallel"""
+    results = {}
+
+    _truncate_user_data()
+    connection = seed.connect_to_prodev()
+    start_time = time.perf_counter()
+    seed.insert_data(connection, csv_file)
+    results['serial'] = time.perf_counter() - start_time
+    connection.close()
+    rows = _count_user_data()
+
+    _truncate_user_data()
+    start_time = time.perf_counter()
+    parallel_seed.insert_data_parallel(csv_file, processes, writers)
+    results['parallel'] = time.perf_counter() - start_time
+
+    print(f"\nSeeding {rows} rows from {csv_file}")
+    for name, elapsed in results.items():
+        rate = rows / elapsed if elapsed > 0 else 0
+        print(f"  {name:<10} {elapsed:8.2f}s {rate:12.0f} rows/sec")
+    if results['parallel'] > 0:
+        print(f"  speedup    {results['serial'] / results['parallel']:.2f}x")
+    return results
+
+
+def _consume_buffered(batch_size):
+    # Baseline: a buffered cursor pulls the entire result set on execute()
+    connection = seed.connect_to_prodev()
+    cursor = connection.cursor(dictionary=True, buffered=True)
+    cursor.execute(f"SELECT {seed.USER_FIELDS} FROM user_data")
+    rows = 0
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        rows += len(batch)
+    cursor.close()
+    connection.close()
+    return rows
+
+
+def _consume_stream_users(batch_size):
+    return sum(1 for _ in stream_users(batch_size))
+
+
+def _consume_stream_users_in_batches(batch_size):
+    return sum(len(batch) for batch in stream_users_in_batches(batch_size))
+
+
+def bench_streaming(batch_size=1000):
+    """Compares peak memory of buffered reads with the unbuffered generators.
+
+    "peak py KB" is the tracemalloc peak of Python allocations; "RSS +KB" is
+    how far the child's resident set grew during the case (see _measure).
+    """
+    cases = {
+        'buffered cursor': _consume_buffered,
+        'stream_users': _consume_stream_users,
+        'stream_users_in_batches': _consume_stream_users_in_batches,
+    }
+    results = {name: run_isolated(func, batch_size) for name, func in cases.items()}
+
+    print(f"\nStreaming user_data (batch size {batch_size})")
+    print(f"  {'case':<25} {'rows':>10} {'rows/sec':>12} {'peak py KB':>12} {'RSS +KB':>10}")
+    for name, result in results.items():
+        print(f"  {name:<25} {result['rows']:>10} {result['rows_per_sec']:>12.0f} "
+              f"{result['peak_traced_kb']:>12} {result['rss_growth_kb']:>10}")
+    return results
+
+
+def bench_pagination(page_size=100, pages=1000):
+    """Counts connections opened by per-page paging vs lazy_paginate"""
+    connect = lazy_paginate_module.connect_to_prodev
+    opened = []
+
+    def counting_connect():
+        opened.append(1)
+        return connect()
+
+    lazy_paginate_module.connect_to_prodev = counting_connect
+    results = {}
+    try:
+        # Previous behaviour: every page opens and closes its own connection
+        del opened[:]
+        start_time = time.perf_counter()
+        rows = 0
+        for page_number in range(pages):
+            page = lazy_paginate_module.paginate_users(page_size, page_number * page_size)
+            if not page:
+                break
+            rows += len(page)
+        results['connection per page'] = (rows, len(opened), time.perf_counter() - start_time)
+
+        del opened[:]
+        start_time = time.perf_counter()
+        rows = 0
+        generator = lazy_paginate_module.lazy_paginate(page_size)
+        for page_number, page in enumerate(generator, 1):
+            rows += len(page)
+            if page_number == pages:
+                break
+        generator.close()
+        results['lazy_paginate'] = (rows, len(opened), time.perf_counter() - start_time)
+    finally:
+        lazy_paginate_module.connect_to_prodev = connect
+
+    print(f"\nPaginating up to {pages} pages of {page_size}")
+    print(f"  {'case':<20} {'rows':>10} {'connections':>12} {'seconds':>10}")
+    for name, (rows, connections, elapsed) in results.items():
+        print(f"  {name:<20} {rows:>10} {connections:>12} {elapsed:>10.2f}")
+    return results
+
+
+def bench_prefetch(batch_size=1000, delay=0.01, batches=200, depth=2):
+    """Wall clock of a slow consumer with and without background prefetch"""
+    results = {}
+    for name, prefetch in (('no prefetch', 0), (f'prefetch depth {depth}', depth)):
+        start_time = time.perf_counter()
+        generator = stream_users_in_batches(batch_size, prefetch=prefetch)
+        rows = 0
+        for count, batch in enumerate(generator, 1):
+            time.sleep(delay)  # simulated per-batch processing cost
+            rows += len(batch)
+            if count == batches:
+                break
+        generator.close()
+        results[name] = (rows, time.perf_counter() - start_time)
+
+    print(f"\nConsuming up to {batches} batches of {batch_size} with {delay}s of work per batch")
+    for name, (rows, elapsed) in results.items():
+        print(f"  {name:<18} {rows:>10} rows {elapsed:>8.2f}s")
+    return results
+
+
+def _build_rows(factory, source):
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    rows = [factory(*row) for row in source]
+    elapsed = time.perf_counter() - start_time
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(rows), size, elapsed
+
+
+def bench_rows(rows=100000):
+    """Bytes per row and build rate of dict rows vs compact row types.
+
+    Works on synthetic rows in memory, isolating the row representation from
+    database and network cost.
+    """
+    columns = stream_users_module.USER_COLUMNS
+    source = [(f"{i:08x}-0000-4000-8000-000000000000", f"User {i}", f"user{i}@example.com", i % 100)
+              for i in range(rows)]
+    factories = {
+        'dict': lambda *values: dict(zip(columns, values)),
+        'namedtuple': stream_users_module.User,
+        'slots': stream_users_module.UserRecord,
+    }
+
+    print(f"\nBuilding {rows} rows (field values shared, so only row overhead is counted)")
+    print(f"  {'row type':<12} {'bytes/row':>10} {'rows/sec':>12}")
+    results = {}
+    for name, factory in factories.items():
+        count, size, elapsed = _build_rows(factory, source)
+        results[name] = {'bytes_per_row': size / count, 'rows_per_sec': count / elapsed}
+        print(f"  {name:<12} {size / count:>10.1f} {count / elapsed:>12.0f}")
+    return results
+
+
+def build_sqlite_dataset(path, rows, random_seed=0, chunk_size=10000):
+    """Creates (or reuses) a SQLite stand-in of user_data with `rows` synthetic users"""
+    if os.path.exists(path):
+        connection = sqlite_backend.connect(path)
+        cursor = connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM user_data")
+        existing = cursor.fetchone()[0]
+        connection.close()
+        if existing == rows:
+            return path
+        os.remove(path)
+
+    connection = sqlite_backend.connect(path)
+    sqlite_backend.create_user_data(connection)
+    generate_user_data.load_table(connection, rows, chunk_size, random_seed)
+    connection.close()
+    return path
+
+
+def _case_stream_users(batch_size, table_rows):
+    return _consume_stream_users(batch_size)
+
+
+def _case_stream_users_in_batches(batch_size, table_rows):
+    return _consume_stream_users_in_batches(batch_size)
+
+
+def _case_lazy_paginate(page_size, table_rows):
+    return sum(len(page) for page in lazy_paginate_module.lazy_paginate(page_size))
+
+
+def _case_calculate_average_age(batch_size, table_rows):
+    # One aggregate over the whole table: report it in table rows per second
+    stream_ages.calculate_average_age()
+    return table_rows
+
+
+SUITE_CASE_FUNCS = {
+    'stream_users': _case_stream_users,
+    'stream_users_in_batches': _case_stream_users_in_batches,
+    'lazy_paginate': _case_lazy_paginate,
+    'calculate_average_age': _case_calculate_average_age,
+}
+
+
+def compare_results(baseline, current, threshold=0.10):
+    """Prints per-case changes against a baseline report; returns the regressions.
+
+    A case regresses when rows/sec drops, or peak RSS grows, by more than
+    threshold (a fraction).
+    """
+    previous = {(r['case'], r['table_rows']): r for r in baseline['results']}
+    regressions = []
+    print(f"\nCompared with baseline from {baseline['meta']['timestamp']}")
+    print(f"  {'case':<25} {'rows':>10} {'rows/sec':>10} {'peak RSS':>10}")
+    for result in current['results']:
+        key = (result['case'], result['table_rows'])
+        if key not in previous:
+            continue
+        before = previous[key]
+        speed = result['rows_per_sec'] / before['rows_per_sec'] - 1 if before['rows_per_sec'] else 0
+        memory = result['peak_rss_kb'] / before['peak_rss_kb'] - 1 if before['peak_rss_kb'] else 0
+        regressed = speed < -threshold or memory > threshold
+        if regressed:
+            regressions.append(key)
+        print(f"  {key[0]:<25} {key[1]:>10} {speed:>+10.1%} {memory:>+10.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def bench_suite(sizes=(10000,), output='benchmark_results.json', compare=None,
+                batch_size=1000, page_size=1000, data_dir='.', cases=SUITE_CASES,
+                threshold=0.10):
+    """Runs every case against SQLite stand-ins of each size and writes JSON.
+
+    Each case runs in a fresh process with its peak RSS reset, so peak RSS
+    is per case. Returns the
+    list of regressions against compare (a previous output file), if given.
+    """
+    results = []
+    previous_backend = os.environ.get('USER_DATA_SQLITE')
+    try:
+        for table_rows in sizes:
+            path = os.path.join(data_dir, f"bench_user_data_{table_rows}.db")
+            build_sqlite_dataset(path, table_rows)
+            os.environ['USER_DATA_SQLITE'] = path
+            for case in cases:
+                size = page_size if case == 'lazy_paginate' else batch_size
+                result = run_isolated(SUITE_CASE_FUNCS[case], size, table_rows,
+                                      trace_allocations=False)
+                result.update({'case': case, 'table_rows': table_rows})
+                results.append(result)
+    finally:
+        if previous_backend is None:
+            os.environ.pop('USER_DATA_SQLITE', None)
+        else:
+            os.environ['USER_DATA_SQLITE'] = previous_backend
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'backend': 'sqlite',
+            'batch_size': batch_size,
+            'page_size': page_size,
+        },
+        'results': results,
+    }
+
+    print(f"\n  {'case':<25} {'rows':>10} {'rows/sec':>12} {'peak RSS KB':>12} {'RSS +KB':>9} "
+          f"{'queries':>8} {'conns':>6}")
+    for result in results:
+        print(f"  {result['case']:<25} {result['table_rows']:>10} {result['rows_per_sec']:>12.0f} "
+              f"{result['peak_rss_kb']:>12} {result['rss_growth_kb']:>9} "
+              f"{result['queries']:>8} {result['connections']:>6}")
+
+    regressions = []
+    if compare:
+        with open(compare, 'r', encoding='utf-8') as file:
+            regressions = compare_results(json.load(file), report, threshold)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"\nResults written to {output}")
+    return regressions
+
+
+def _table_profile(cursor, queries, repeat):
+    cursor.execute("ANALYZE TABLE user_data")
+    cursor.fetchall()
+    try:
+        # MySQL 8 caches table statistics in information_schema for a day
+        cursor.execute("SET SESSION information_schema_stats_expiry = 0")
+    except Exception:
+        pass
+    cursor.execute("""
+        SELECT data_length, index_length FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = 'user_data'
+    """)
+    data_length, index_length = cursor.fetchone()
+
+    latencies = {}
+    for name, (query, params) in queries.items():
+        timings = []
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            cursor.execute(query, params)
+            cursor.fetchall()
+            timings.append(time.perf_counter() - start_time)
+        timings.sort()
+        latencies[name] = timings[len(timings) // 2] * 1000
+    return {'data_kb': data_length // 1024, 'index_kb': index_length // 1024, 'median_ms': latencies}
+
+
+def bench_schema(repeat=50):
+    """Table size and query latency before and after migrate_user_data_schema"""
+    connection = seed.connect_to_prodev()
+    cursor = connection.cursor()
+    cursor.execute("SELECT COUNT(*) FROM user_data")
+    count = cursor.fetchone()[0]
+    cursor.execute("SELECT user_id, email FROM user_data LIMIT 1 OFFSET %s", (count // 2,))
+    user_id, email = cursor.fetchone()
+    queries = {
+        'lookup by user_id': (f"SELECT {seed.USER_FIELDS} FROM user_data WHERE user_id = %s", (user_id,)),
+        'lookup by email': (f"SELECT {seed.USER_FIELDS} FROM user_data WHERE email = %s", (email,)),
+        'count age > 80': ("SELECT COUNT(*) FROM user_data WHERE age > %s", (80,)),
+        'keyset page of 1000': (
+            f"SELECT {seed.USER_FIELDS} FROM user_data WHERE user_id > %s ORDER BY user_id LIMIT 1000", (user_id,)
+        ),
+    }
+
+    before = _table_profile(cursor, queries, repeat)
+    seed.migrate_user_data_schema(connection)
+    after = _table_profile(cursor, queries, repeat)
+    cursor.close()
+    connection.close()
+
+    print(f"\nuser_data with {count} rows")
+    print(f"  {'':<22} {'before':>10} {'after':>10}")
+    print(f"  {'data KB':<22} {before['data_kb']:>10} {after['data_kb']:>10}")
+    print(f"  {'index KB':<22} {before['index_kb']:>10} {after['index_kb']:>10}")
+    for name in queries:
+        print(f"  {name + ' (ms)':<22} {before['median_ms'][name]:>10.3f} {after['median_ms'][name]:>10.3f}")
+    return {'before': before, 'after': after}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    suite = subparsers.add_parser('suite', help='generator suite on SQLite stand-ins, JSON output')
+    suite.add_argument('--rows', type=int, nargs='+', default=[10000])
+    suite.add_argument('--output', default='benchmark_results.json')
+    suite.add_argument('--compare', help='previous results file to compare against')
+    suite.add_argument('--threshold', type=float, default=0.10)
+    suite.add_argument('--batch-size', type=int, default=1000)
+    suite.add_argument('--page-size', type=int, default=1000)
+    suite.add_argument('--data-dir', default='.')
+    suite.add_argument('--cases', nargs='+', choices=SUITE_CASES, default=list(SUITE_CASES))
+
+    seeding = subparsers.add_parser('seeding', help='serial vs parallel CSV seeding')
+    seeding.add_argument('csv_file', nargs='?', default='user_data.csv')
+    seeding.add_argument('--processes', type=int, default=None)
+    seeding.add_argument('--writers', type=int, default=4)
+
+    streaming = subparsers.add_parser('streaming', help='memory of buffered vs streamed reads')
+    streaming.add_argument('--batch-size', type=int, default=1000)
+
+    pagination = subparsers.add_parser('pagination', help='connections opened while paginating')
+    pagination.add_argument('--page-size', type=int, default=100)
+    pagination.add_argument('--pages', type=int, default=1000)
+
+    prefetch = subparsers.add_parser('prefetch', help='slow consumer with and without prefetch')
+    prefetch.add_argument('--batch-size', type=int, default=1000)
+    prefetch.add_argument('--delay', type=float, default=0.01)
+    prefetch.add_argument('--batches', type=int, default=200)
+    prefetch.add_argument('--depth', type=int, default=2)
+
+    row_types = subparsers.add_parser('rows', help='dict vs compact row representations')
+    row_types.add_argument('--rows', type=int, default=100000)
+
+    schema = subparsers.add_parser('schema', help='table size and latency around the schema migration')
+    schema.add_argument('--repeat', type=int, default=50)
+
+    args = parser.parse_args()
+    if args.benchmark == 'suite':
+        regressions = bench_suite(args.rows, args.output, args.compare, args.batch_size,
+                                  args.page_size, args.data_dir, args.cases, args.threshold)
+        if regressions:
+            sys.exit(1)
+    elif args.benchmark == 'seeding':
+        bench_seeding(args.csv_file, args.processes, args.writers)
+    elif args.benchmark == 'streaming':
+        bench_streaming(args.batch_size)
+    elif args.benchmark == 'pagination':
+        bench_pagination(args.page_size, args.pages)
+    elif args.benchmark == 'prefetch':
+        bench_prefetch(args.batch_size, args.delay, args.batches, args.depth)
+    elif args.benchmark == 'rows':
+        bench_rows(args.rows)
+    elif args.benchmark == 'schema':
+        bench_schema(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
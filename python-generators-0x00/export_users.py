@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+"""Export user_data to Parquet or compressed CSV with bounded memory.
+
+    python3 export_users.py users.parquet --row-group-size 100000
+    python3 export_users.py users.csv.zst --level 3
+    python3 export_users.py users.csv.gz
+"""
+import argparse
+import csv
+import gzip
+import io
+import time
+
+stream_users_in_batches = __import__('1-batch_processing').stream_users_in_batches
+
+EXPORT_COLUMNS = ("user_id", "name", "email", "age")
+
+
+def _rows(batches):
+    for batch in batches:
+        yield [(row["user_id"], row["name"], row["email"], int(row["age"])) for row in batch]
+
+
+def export_parquet(path, batches, row_group_size=100000, compression="zstd"):
+    # Rows are buffered only up to one row group, then flushed, so memory is
+    # bounded by row_group_size no matter how large the table is
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("user_id", pa.string()),
+        ("name", pa.string()),
+        ("email", pa.string()),
+        ("age", pa.int16()),
+    ])
+    total_rows = 0
+    pending = []
+
+    def write_row_group(writer, rows):
+        columns = list(zip(*rows))
+        writer.write_table(pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema
+        ), row_group_size=len(rows))
+
+    with pq.ParquetWriter(path, schema, compression=compression) as writer:
+        for rows in _rows(batches):
+            pending.extend(rows)
+            total_rows += len(rows)
+            while len(pending) >= row_group_size:
+                write_row_group(writer, pending[:row_group_size])
+                del pending[:row_group_size]
+        if pending:
+            write_row_group(writer, pending)
+    return total_rows
+
+
+def _open_compressed(path, level):
+    if path.endswith(".zst"):
+        import zstandard
+
+        raw = open(path, "wb")
+        return raw, zstandard.ZstdCompressor(level=level).stream_writer(raw)
+    return None, gzip.open(path, "wb", compresslevel=level)
+
+
+def export_csv(path, batches, level=3):
+    # Each batch is written straight through the compressor, so only one
+    # batch is ever held in memory
+    raw, binary = _open_compressed(path, level)
+    total_rows = 0
+    try:
+        with io.TextIOWrapper(binary, encoding="utf-8", newline="") as text:
+            writer = csv.writer(text)
+            writer.writerow(EXPORT_COLUMNS)
+            for rows in _rows(batches):
+                writer.writerows(rows)
+                total_rows += len(rows)
+    finally:
+        if raw is not None:
+            raw.close()
+    return total_rows
+
+
+def export_users(path, batch_size=10000, row_group_size=100000, level=3):
+    batches = stream_users_in_batches(batch_size)
+    start_time = time.perf_counter()
+    if path.endswith(".parquet"):
+        total_rows = export_parquet(path, batches, row_group_size)
+    elif path.endswith((".csv.zst", ".csv.gz")):
+        total_rows = export_csv(path, batches, level)
+    else:
+        raise ValueError(f"Unsupported export format for {path} (use .parquet, .csv.zst or .csv.gz)")
+    elapsed = time.perf_counter() - start_time
+    print(f"Exported {total_rows} users to {path} in {elapsed:.2f}s")
+    return total_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="output file: .parquet, .csv.zst or .csv.gz")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--row-group-size", type=int, default=100000)
+    parser.add_argument("--level", type=int, default=3, help="CSV compression level")
+    args = parser.parse_args()
+    export_users(args.path, args.batch_size, args.row_group_size, args.level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+"""Generate synthetic user_data at any scale.
+
+    python3 generate_user_data.py 1000000 --csv user_data.csv
+    python3 generate_user_data.py 1000000 --load
+
+Output is deterministic for a given --seed (and random backend: numpy when
+installed, the random module otherwise).
+"""
+import argparse
+import csv
+import time
+
+import seed
+
+try:
+    import numpy as np
+except ImportError:  # falls back to the random module
+    np = None
+    import random
+
+FIRST_NAMES = (
+    "Ada", "Alan", "Amara", "Ben", "Chidi", "Dana", "Efua", "Emeka", "Fatima", "Grace",
+    "Hassan", "Ifeoma", "Jamal", "Kemi", "Kofi", "Lena", "Musa", "Nadia", "Olu", "Priya",
+    "Quinn", "Rosa", "Sade", "Tariq", "Uche", "Vera", "Wanjiru", "Xavier", "Yusuf", "Zara",
+)
+LAST_NAMES = (
+    "Abara", "Bello", "Carter", "Diallo", "Eze", "Fofana", "Garcia", "Hughes", "Ibrahim", "Johnson",
+    "Kamau", "Lopez", "Mensah", "Nwosu", "Okafor", "Patel", "Quaye", "Reyes", "Smith", "Tanaka",
+    "Usman", "Vargas", "Walker", "Xu", "Yeboah", "Zulu",
+)
+DOMAINS = ("example.com", "mail.com", "test.org", "sample.net")
+MIN_AGE, MAX_AGE = 18, 90
+
+
+def _random_columns(count, rng):
+    # One draw per column for the whole chunk instead of one call per row
+    if np is not None:
+        return (
+            rng.integers(0, len(FIRST_NAMES), count).tolist(),
+            rng.integers(0, len(LAST_NAMES), count).tolist(),
+            rng.integers(0, len(DOMAINS), count).tolist(),
+            rng.integers(MIN_AGE, MAX_AGE + 1, count).tolist(),
+        )
+    return (
+        rng.choices(range(len(FIRST_NAMES)), k=count),
+        rng.choices(range(len(LAST_NAMES)), k=count),
+        rng.choices(range(len(DOMAINS)), k=count),
+        rng.choices(range(MIN_AGE, MAX_AGE + 1), k=count),
+    )
+
+
+def generate_chunks(rows, chunk_size=100000, random_seed=0, with_ids=True):
+    """Yields lists of (user_id, name, email, age) tuples, rows in total.
+
+    Emails embed the row number so they are unique; user_id is
+    seed.user_id_for(email), the same id the upsert loaders derive, or None
+    when with_ids is false (hashing is the most expensive step per row).
+    """
+    rng = np.random.default_rng(random_seed) if np is not None else random.Random(random_seed)
+    for start in range(0, rows, chunk_size):
+        count = min(chunk_size, rows - start)
+        firsts, lasts, domains, ages = _random_columns(count, rng)
+        chunk = []
+        for offset, (first, last, domain, age) in enumerate(zip(firsts, lasts, domains, ages)):
+            first_name, last_name = FIRST_NAMES[first], LAST_NAMES[last]
+            email = f"{first_name}.{last_name}.{start + offset}@{DOMAINS[domain]}".lower()
+            user_id = seed.user_id_for(email) if with_ids else None
+            chunk.append((user_id, f"{first_name} {last_name}", email, age))
+        yield chunk
+
+
+def write_csv(path, rows, chunk_size=100000, random_seed=0):
+    # Same name,email,age layout as the user_data.csv the seed loaders read
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(("name", "email", "age"))
+        for chunk in generate_chunks(rows, chunk_size, random_seed, with_ids=False):
+            writer.writerows((name, email, age) for _, name, email, age in chunk)
+
+
+def load_table(connection, rows, chunk_size=10000, random_seed=0):
+    # Straight into user_data through the chunked bulk insert path
+    return seed.bulk_insert_rows(connection, generate_chunks(rows, chunk_size, random_seed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("rows", type=int)
+    parser.add_argument("--csv", help="write a CSV file to this path")
+    parser.add_argument("--load", action="store_true", help="insert into user_data")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+    if not args.csv and not args.load:
+        parser.error("choose --csv PATH and/or --load")
+
+    if args.csv:
+        start_time = time.perf_counter()
+        write_csv(args.csv, args.rows, args.chunk_size, args.seed)
+        print(f"Wrote {args.rows} rows to {args.csv} in {time.perf_counter() - start_time:.2f}s")
+    if args.load:
+        connection = seed.connect_to_prodev()
+        if connection is None:
+            return
+        total_rows, elapsed = load_table(connection, args.rows, args.chunk_size, args.seed)
+        connection.close()
+        print(f"Inserted {total_rows} rows in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import seed
+
+
+def split_csv_ranges(csv_file, range_bytes=8 * 1024 * 1024):
+    # Cut the data section into ~range_bytes pieces, moving every cut forward
+    # to the next line start so no row is split between two ranges
+    size = os.path.getsize(csv_file)
+    with open(csv_file, 'rb') as file:
+        file.readline()
+        start = file.tell()
+        ranges = []
+        while start < size:
+            file.seek(min(start + range_bytes, size))
+            if file.tell() < size:
+                file.readline()
+            end = file.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_range(csv_file, start, end, chunk_size):
+    # Runs in a worker process: CSV parsing, uuid5 and int conversion are the
+    # CPU-bound part of seeding and scale across cores here
+    chunks = []
+    chunk = []
+    for row, _ in seed.read_csv_records(csv_file, start, end):
+        chunk.append((seed.user_id_for(row["email"]), row["name"], row["email"], int(row["age"])))
+        if len(chunk) == chunk_size:
+            chunks.append(chunk)
+            chunk = []
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def _writer(chunk_queue, totals, errors, lock):
+    # A dedicated connection per writer: drawing from the pool would stall
+    # every writer beyond MYSQL_POOL_SIZE
+    connection = seed.connect_to_prodev(dedicated=True)
+    cursor = connection.cursor() if connection else None
+    if cursor is None:
+        errors.append("writer could not connect to ALX_prodev")
+    written = 0
+    while True:
+        chunk = chunk_queue.get()
+        if chunk is None:
+            break
+        # After a failure keep draining so the parser side never blocks
+        if cursor is None or errors:
+            continue
+        try:
+            cursor.executemany(seed.UPSERT_USER_QUERY, chunk)
+            connection.commit()
+            written += len(chunk)
+        except Exception as e:
+            errors.append(str(e))
+    if cursor is not None:
+        cursor.close()
+        connection.close()
+    with lock:
+        totals.append(written)
+
+
+def insert_data_parallel(csv_file, processes=None, writers=4, chunk_size=1000,
+                         range_bytes=8 * 1024 * 1024):
+    # Parse byte ranges in a process pool and feed the chunks through a
+    # bounded queue to a fixed number of writer connections. Upserts keyed on
+    # seed.user_id_for keep the load idempotent whatever order ranges land in.
+    processes = processes or os.cpu_count() or 1
+    chunk_queue = queue.Queue(maxsize=writers * 2)
+    totals, errors = [], []
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=_writer, args=(chunk_queue, totals, errors, lock), daemon=True)
+        for _ in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    start_time = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            pending = set()
+            for start, end in split_csv_ranges(csv_file, range_bytes):
+                pending.add(pool.submit(parse_range, csv_file, start, end, chunk_size))
+                # Only keep a couple of ranges per process in flight so parsed
+                # rows can't pile up faster than the writers drain them
+                while len(pending) >= processes * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for chunk in future.result():
+                            chunk_queue.put(chunk)
+            for future in pending:
+                for chunk in future.result():
+                    chunk_queue.put(chunk)
+    finally:
+        for _ in threads:
+            chunk_queue.put(None)
+        for thread in threads:
+            thread.join()
+
+    elapsed = time.perf_counter() - start_time
+    total_rows = sum(totals)
+    if errors:
+        print(f"Parallel insert error: {errors[0]}")
+    rate = total_rows / elapsed if elapsed > 0 else 0
+    print(f"Data upserted: {total_rows} rows in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    return total_rows, elapsed
+
+
+if __name__ == "__main__":
+    csv_file = sys.argv[1] if len(sys.argv) > 1 else "user_data.csv"
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    insert_data_parallel(csv_file, processes, writers)
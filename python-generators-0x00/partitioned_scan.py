@@ -0,0 +1,122 @@
+#!/usr/bin/python3
+import multiprocessing
+import os
+import queue
+
+import mysql.connector
+
+import seed
+
+
+def partition_bounds(partitions):
+    # user_ids are uuid4/uuid5 strings, spread uniformly over the hex keyspace,
+    # so evenly spaced 8-hex-digit prefixes cut the table into even key ranges.
+    # Returns [(lower, upper), ...] with None for the open ends.
+    cuts = [format(i * 16 ** 8 // partitions, "08x") for i in range(1, partitions)]
+    lowers = [None] + cuts
+    uppers = cuts + [None]
+    return list(zip(lowers, uppers))
+
+
+def _scan_range(task):
+    # Runs in a worker process with its own dedicated connection (not the
+    # shared pool, which would open POOL_SIZE connections in every worker)
+    func, lower, upper, batch_size = task
+    conditions, params = [], []
+    if lower is not None:
+        conditions.append("user_id >= %s")
+        params.append(lower)
+    if upper is not None:
+        conditions.append("user_id < %s")
+        params.append(upper)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    conn = seed.connect_to_prodev(dedicated=True)
+    if conn is None:
+        raise mysql.connector.Error("Could not connect to ALX_prodev")
+    try:
+        cursor = conn.cursor(dictionary=True, buffered=False)
+        cursor.execute(f"SELECT {seed.USER_FIELDS} FROM user_data{where} ORDER BY user_id", params)
+        results = []
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            results.append(func(batch))
+        cursor.close()
+        return results
+    finally:
+        conn.close()
+
+
+def parallel_scan(func, processes=None, partitions=None, ordered=False, batch_size=1000,
+                  max_pending=None):
+    # Applies func (a picklable, module-level function) to every batch of
+    # user_data, one key range per task across a process pool, and yields
+    # func's results. ordered=True yields them in user_id order; otherwise
+    # ranges are merged as they finish.
+    #
+    # Memory: a task returns func's results for its whole range, so a worker
+    # holds (and pickles back) output for about table_rows / partitions rows.
+    # The default of at least 256 partitions keeps ranges small; pass more for
+    # very large tables, or a func that reduces each batch (a count, a sum)
+    # instead of returning rows. At most max_pending ranges (default
+    # 2 * processes) are in flight or waiting in the parent at once.
+    processes = processes or os.cpu_count() or 1
+    partitions = partitions or max(processes * 4, 256)
+    max_pending = max_pending or processes * 2
+    tasks = iter(enumerate(
+        (func, lower, upper, batch_size) for lower, upper in partition_bounds(partitions)
+    ))
+    finished = queue.Queue()
+
+    with multiprocessing.Pool(processes) as pool:
+        def submit():
+            # Schedules the next range; False once every range is submitted
+            for index, task in tasks:
+                pool.apply_async(
+                    _scan_range, (task,),
+                    callback=lambda results, index=index: finished.put((index, results, None)),
+                    error_callback=lambda error, index=index: finished.put((index, None, error))
+                )
+                return True
+            return False
+
+        outstanding = 0
+        while outstanding < max_pending and submit():
+            outstanding += 1
+        ready, next_index = {}, 0
+        while outstanding:
+            index, results, error = finished.get()
+            if error is not None:
+                raise error
+            ready[index] = results
+            # Ordered scans hold finished ranges until the earlier ones arrive;
+            # they still count against max_pending until yielded
+            while ready:
+                if ordered:
+                    if next_index not in ready:
+                        break
+                    results = ready.pop(next_index)
+                    next_index += 1
+                else:
+                    results = ready.pop(index)
+                outstanding -= 1
+                if submit():
+                    outstanding += 1
+                yield from results
+
+
+def users_over_25(batch):
+    return [user for user in batch if user["age"] > 25]
+
+
+def parallel_batch_processing(batch_size=1000, processes=None):
+    # Partitioned counterpart of 1-batch_processing.batch_processing
+    for users in parallel_scan(users_over_25, processes, batch_size=batch_size):
+        for user in users:
+            print(user)
+
+
+if __name__ == "__main__":
+    parallel_batch_processing()
@@ -1,15 +1,100 @@
 import mysql.connector
 import csv
+import json
+import os
+import threading
+import time
 import uuid
+import zlib
 from mysql.connector import Error
+from mysql.connector.errors import PoolError
+from mysql.connector.pooling import MySQLConnectionPool
+
+INSERT_USER_QUERY = """
+    INSERT INTO user_data (user_id, name, email, age)
+    VALUES (%s, %s, %s, %s)
+"""
+
+UPSERT_USER_QUERY = """
+    INSERT INTO user_data (user_id, name, email, age)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE name = VALUES(name), email = VALUES(email), age = VALUES(age)
+"""
+
+# Columns the generators select; listing them keeps the row shape fixed when
+# bookkeeping columns such as updated_at are added to the table
+USER_COLUMNS = ("user_id", "name", "email", "age")
+USER_FIELDS = ", ".join(USER_COLUMNS)
+
+# Fixed namespace so the same email always maps to the same user_id
+USER_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_DNS, "user_data.alx_prodev")
+
+POOL_SIZE = int(os.environ.get("MYSQL_POOL_SIZE", "5"))
+POOL_TIMEOUT = float(os.environ.get("MYSQL_POOL_TIMEOUT", "30"))
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def db_config(database="ALX_prodev"):
+    # Connection settings come from the environment; the defaults match the
+    # local development setup
+    config = {
+        "host": os.environ.get("MYSQL_HOST", "localhost"),
+        "port": int(os.environ.get("MYSQL_PORT", "3306")),
+        "user": os.environ.get("MYSQL_USER", "root"),
+        "password": os.environ.get("MYSQL_PASSWORD", "root"),
+        "connection_timeout": int(os.environ.get("MYSQL_CONNECT_TIMEOUT", "10")),
+    }
+    if database:
+        config["database"] = os.environ.get("MYSQL_DATABASE", database)
+    return config
+
+def get_pool():
+    global _pool, _pool_pid
+    with _pool_lock:
+        # A pool inherited through fork shares the parent's sockets, so each
+        # process builds its own
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = MySQLConnectionPool(
+                pool_name=f"alx_prodev_{os.getpid()}",
+                pool_size=POOL_SIZE,
+                pool_reset_session=True,
+                # Only short results are read on pooled connections (full-table
+                # streams use connect_to_prodev(dedicated=True)), so draining
+                # leftover rows on return is cheap
+                consume_results=True,
+                **db_config()
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+def get_connection(timeout=POOL_TIMEOUT):
+    # MySQLConnectionPool fails immediately when exhausted, so wait for a
+    # connection to be returned until the timeout runs out
+    pool = get_pool()
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            connection = pool.get_connection()
+            break
+        except PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+    # Health check on checkout: transparently reconnect if the server
+    # dropped the idle connection
+    try:
+        connection.ping(reconnect=True, attempts=1, delay=0)
+    except Error:
+        connection.close()  # hand the slot back to the pool
+        raise
+    return connection
 
 def connect_db():
     try:
-        connection = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="root"
-        )
+        connection = mysql.connector.connect(**db_config(database=None))
         return connection
     except Error as e:
         print(f"Error: {e}")
@@ -24,15 +109,21 @@ def create_database(connection):
     except Error as e:
         print(f"Error: {e}")
 
-def connect_to_prodev():
+def connect_to_prodev(allow_local_infile=False, dedicated=False):
+    # Returns a pooled connection; close() hands it back to the pool.
+    # LOAD DATA LOCAL needs its own connection flag, so that case bypasses it.
+    # dedicated=True also bypasses it, for unbuffered full-table streams: a
+    # pooled connection would read every unread row off the socket when
+    # returned, while closing a dedicated one simply drops the socket.
+    sqlite_path = os.environ.get("USER_DATA_SQLITE")
+    if sqlite_path:
+        # Local stand-in for benchmarks and tests, see sqlite_backend.py
+        import sqlite_backend
+        return sqlite_backend.connect(sqlite_path)
     try:
-        connection = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="root",
-            database="ALX_prodev"
-        )
-        return connection
+        if allow_local_infile or dedicated:
+            return mysql.connector.connect(allow_local_infile=allow_local_infile, **db_config())
+        return get_connection()
     except Error as e:
         print(f"Error: {e}")
         return None
@@ -42,11 +133,15 @@ def create_table(connection):
         cursor = connection.cursor()
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS user_data (
-                user_id CHAR(36) PRIMARY KEY,
+                user_id CHAR(36) CHARACTER SET ascii COLLATE ascii_bin NOT NULL PRIMARY KEY,
                 name VARCHAR(255) NOT NULL,
                 email VARCHAR(255) NOT NULL,
                 age DECIMAL(3, 0) NOT NULL,
-                INDEX idx_user_id (user_id)
+                updated_at TIMESTAMP(6) NOT NULL
+                    DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+                UNIQUE INDEX idx_email (email),
+                INDEX idx_age (age),
+                INDEX idx_updated_at (updated_at, user_id)
             )
         """)
         cursor.close()
@@ -54,6 +149,94 @@ def create_table(connection):
     except Error as e:
         print(f"Error: {e}")
 
+def create_age_index(connection):
+    # CREATE TABLE IF NOT EXISTS won't touch existing tables, so add the
+    # index that age filters push down onto separately
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = 'user_data'
+            AND index_name = 'idx_age'
+        """)
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("CREATE INDEX idx_age ON user_data (age)")
+            print("Index created")
+        cursor.close()
+    except Error as e:
+        print(f"Error: {e}")
+
+def add_updated_at_column(connection):
+    # High-water mark for tail mode (0-stream_users.stream_users_tail): MySQL
+    # bumps updated_at on every insert and on every update that changes a row
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = 'user_data'
+            AND column_name = 'updated_at'
+        """)
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("""
+                ALTER TABLE user_data
+                ADD COLUMN updated_at TIMESTAMP(6) NOT NULL
+                    DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+                ADD INDEX idx_updated_at (updated_at, user_id)
+            """)
+            print("Column updated_at added")
+        cursor.close()
+    except Error as e:
+        print(f"Error: {e}")
+
+def migrate_user_data_schema(connection):
+    # Brings an existing user_data table in line with create_table, in one
+    # ALTER (one table rebuild):
+    # - user_id as ascii CHAR(36): a 36-byte key instead of up to 144 bytes
+    #   under utf8mb4, in the primary key and in every secondary index
+    # - drop idx_user_id, which duplicates the primary key
+    # - add idx_age and a unique idx_email for the filters and lookups we run
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT DISTINCT index_name FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = 'user_data'
+        """)
+        indexes = {name for (name,) in cursor.fetchall()}
+        cursor.execute("""
+            SELECT character_set_name FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = 'user_data'
+            AND column_name = 'user_id'
+        """)
+        (charset,) = cursor.fetchone()
+
+        changes = []
+        if charset != "ascii":
+            changes.append("MODIFY user_id CHAR(36) CHARACTER SET ascii COLLATE ascii_bin NOT NULL")
+        if "idx_user_id" in indexes:
+            changes.append("DROP INDEX idx_user_id")
+        if "idx_age" not in indexes:
+            changes.append("ADD INDEX idx_age (age)")
+        if "idx_email" not in indexes:
+            cursor.execute("""
+                SELECT COUNT(*) FROM (
+                    SELECT email FROM user_data GROUP BY email HAVING COUNT(*) > 1
+                ) AS duplicates
+            """)
+            duplicates = cursor.fetchone()[0]
+            if duplicates:
+                print(f"Skipping unique idx_email: {duplicates} duplicated emails")
+            else:
+                changes.append("ADD UNIQUE INDEX idx_email (email)")
+
+        if changes:
+            cursor.execute(f"ALTER TABLE user_data {', '.join(changes)}")
+            print(f"Table migrated: {'; '.join(changes)}")
+        else:
+            print("Table already up to date")
+        cursor.close()
+    except Error as e:
+        print(f"Error: {e}")
+
 def insert_data(connection, csv_file):
     try:
         cursor = connection.cursor()
@@ -76,4 +259,232 @@ def insert_data(connection, csv_file):
         cursor.close()
         print("Data inserted")
     except Exception as e:
-        print(f"Insert error: {e}")
\ No newline at end of file
+        print(f"Insert error: {e}")
+
+def read_csv_chunks(csv_file, chunk_size=1000):
+    with open(csv_file, 'r', newline='', encoding='utf-8') as file:
+        reader = csv.DictReader(file)
+        chunk = []
+        for row in reader:
+            chunk.append((str(uuid.uuid4()), row["name"], row["email"], int(row["age"])))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def bulk_insert_rows(connection, chunks):
+    # executemany rewrites the INSERT into one multi-row statement per chunk,
+    # and committing per chunk keeps transactions small on large files
+    cursor = connection.cursor()
+    total_rows = 0
+    start_time = time.perf_counter()
+    try:
+        for chunk in chunks:
+            cursor.executemany(INSERT_USER_QUERY, chunk)
+            connection.commit()
+            total_rows += len(chunk)
+    finally:
+        cursor.close()
+    return total_rows, time.perf_counter() - start_time
+
+
+def load_data_infile(connection, csv_file):
+    # Needs connect_to_prodev(allow_local_infile=True) and local_infile=ON server-side
+    with open(csv_file, 'r', newline='', encoding='utf-8') as file:
+        header = next(csv.reader(file), [])
+
+    columns = [name if name in ("name", "email", "age") else "@skip" for name in header]
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"""
+            LOAD DATA LOCAL INFILE %s INTO TABLE user_data
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+            LINES TERMINATED BY '\\n'
+            IGNORE 1 LINES
+            ({", ".join(columns)})
+            SET user_id = UUID()
+        """, (csv_file,))
+        connection.commit()
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def insert_data_bulk(connection, csv_file, chunk_size=1000, local_infile=False):
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM user_data")
+        count = cursor.fetchone()[0]
+        cursor.close()
+        if count > 0:
+            print("Data already exists")
+            return
+
+        start_time = time.perf_counter()
+        total_rows = None
+        if local_infile:
+            try:
+                total_rows = load_data_infile(connection, csv_file)
+            except Error as e:
+                print(f"LOAD DATA unavailable, falling back to chunked inserts: {e}")
+                connection.rollback()
+
+        if total_rows is None:
+            total_rows, _ = bulk_insert_rows(connection, read_csv_chunks(csv_file, chunk_size))
+
+        elapsed = time.perf_counter() - start_time
+        rate = total_rows / elapsed if elapsed > 0 else 0
+        print(f"Data inserted: {total_rows} rows in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    except Exception as e:
+        print(f"Insert error: {e}")
+
+
+def user_id_for(email):
+    return str(uuid.uuid5(USER_ID_NAMESPACE, email.strip().lower()))
+
+
+def read_csv_records(csv_file, start_offset=0, end_offset=None):
+    # Binary mode keeps file.tell() exact so every row carries a resumable
+    # byte offset; rows are parsed per line, so no embedded newlines in fields
+    with open(csv_file, 'rb') as file:
+        header = next(csv.reader([file.readline().decode("utf-8-sig")]), [])
+        if start_offset > file.tell():
+            file.seek(start_offset)
+        for line in iter(file.readline, b""):
+            if end_offset is not None and file.tell() - len(line) >= end_offset:
+                break
+            values = next(csv.reader([line.decode("utf-8")]), None)
+            if values:
+                yield dict(zip(header, values)), file.tell()
+
+
+def read_checkpoint(checkpoint_file, csv_file):
+    try:
+        with open(checkpoint_file, 'r', encoding='utf-8') as file:
+            checkpoint = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return 0, 0
+    if checkpoint.get("offset", 0) > os.path.getsize(csv_file):
+        return 0, 0
+    return checkpoint.get("offset", 0), checkpoint.get("rows", 0)
+
+
+def write_checkpoint(checkpoint_file, offset, rows):
+    temp_file = f"{checkpoint_file}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as file:
+        json.dump({"offset": offset, "rows": rows}, file)
+    os.replace(temp_file, checkpoint_file)
+
+
+def insert_data_resumable(connection, csv_file, batch_size=1000, checkpoint_file=None):
+    # Upserts keyed on a uuid5 of the email make re-runs idempotent, and the
+    # byte offset of the last committed batch lets a crashed load resume;
+    # at worst the batch in flight is applied twice, which the upsert absorbs
+    checkpoint_file = checkpoint_file or f"{csv_file}.checkpoint"
+    try:
+        offset, total_rows = read_checkpoint(checkpoint_file, csv_file)
+        if offset:
+            print(f"Resuming at byte {offset} ({total_rows} rows already loaded)")
+
+        cursor = connection.cursor()
+        batch = []
+        start_time = time.perf_counter()
+        try:
+            for row, end_offset in read_csv_records(csv_file, offset):
+                batch.append((user_id_for(row["email"]), row["name"], row["email"], int(row["age"])))
+                if len(batch) == batch_size:
+                    cursor.executemany(UPSERT_USER_QUERY, batch)
+                    connection.commit()
+                    total_rows += len(batch)
+                    write_checkpoint(checkpoint_file, end_offset, total_rows)
+                    batch = []
+            if batch:
+                cursor.executemany(UPSERT_USER_QUERY, batch)
+                connection.commit()
+                total_rows += len(batch)
+        finally:
+            cursor.close()
+
+        if os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
+        elapsed = time.perf_counter() - start_time
+        print(f"Data upserted: {total_rows} rows ({elapsed:.2f}s this run)")
+    except Exception as e:
+        print(f"Upsert error: {e}")
+
+
+def shard_connections():
+    # One direct connection per shard, in shard order. USER_DATA_SQLITE_SHARDS
+    # lists SQLite files and MYSQL_SHARDS lists host[:port] servers that each
+    # hold the same ALX_prodev schema (both comma separated). Without either,
+    # the ALX_prodev database is the only shard, on a dedicated connection
+    # like the other full-table streams.
+    sqlite_paths = os.environ.get("USER_DATA_SQLITE_SHARDS")
+    if sqlite_paths:
+        import sqlite_backend
+        return [sqlite_backend.connect(path.strip()) for path in sqlite_paths.split(",")]
+    servers = os.environ.get("MYSQL_SHARDS")
+    if not servers:
+        connection = connect_to_prodev(dedicated=True)
+        return [connection] if connection is not None else None
+
+    connections = []
+    try:
+        for server in servers.split(","):
+            host, _, port = server.strip().partition(":")
+            config = db_config()
+            config["host"] = host
+            if port:
+                config["port"] = int(port)
+            connections.append(mysql.connector.connect(**config))
+        return connections
+    except Error as e:
+        print(f"Error: {e}")
+        for connection in connections:
+            connection.close()
+        return None
+
+
+def shard_for(user_id, shards):
+    # crc32 is stable across processes and runs (unlike hash()), so a user_id
+    # always routes to the same shard
+    return zlib.crc32(user_id.encode()) % shards
+
+
+def insert_data_sharded(connections, csv_file, chunk_size=1000):
+    # Sharded counterpart of insert_data: every row goes to the shard its
+    # user_id hashes to, one multi-row insert per shard per chunk
+    try:
+        for connection in connections:
+            cursor = connection.cursor()
+            cursor.execute("SELECT COUNT(*) FROM user_data")
+            count = cursor.fetchone()[0]
+            cursor.close()
+            if count > 0:
+                print("Data already exists")
+                return None
+
+        shards = len(connections)
+        cursors = [connection.cursor() for connection in connections]
+        totals = [0] * shards
+        try:
+            for chunk in read_csv_chunks(csv_file, chunk_size):
+                routed = [[] for _ in range(shards)]
+                for row in chunk:
+                    routed[shard_for(row[0], shards)].append(row)
+                for shard, rows in enumerate(routed):
+                    if rows:
+                        cursors[shard].executemany(INSERT_USER_QUERY, rows)
+                        connections[shard].commit()
+                        totals[shard] += len(rows)
+        finally:
+            for cursor in cursors:
+                cursor.close()
+        print(f"Data inserted: {sum(totals)} rows across {shards} shards {totals}")
+        return totals
+    except Exception as e:
+        print(f"Insert error: {e}")
+        return None
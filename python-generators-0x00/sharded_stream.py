@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+"""Streams user_data from every shard at once (see seed.shard_connections).
+
+Each shard is read by its own thread, so the shards' queries run
+concurrently; batches are either merged as they arrive or, with
+ordered=True, merged into one user_id-ordered stream.
+
+    USER_DATA_SQLITE_SHARDS=shard0.db,shard1.db python3 sharded_stream.py
+"""
+import heapq
+import queue
+import threading
+
+import seed
+
+_DONE = object()
+
+
+def _shard_batches(connection, batch_size, ordered):
+    try:
+        # Unbuffered cursor per shard: memory is bounded by batch_size per shard
+        cursor = connection.cursor(dictionary=True, buffered=False)
+        if ordered:
+            cursor.execute(f"SELECT {seed.USER_FIELDS} FROM user_data ORDER BY user_id")
+        else:
+            cursor.execute(f"SELECT {seed.USER_FIELDS} FROM user_data")
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            yield batch
+        cursor.close()
+    finally:
+        connection.close()
+
+
+def fan_in(sources, depth=1):
+    # Runs each batch generator in its own thread and yields batches from all
+    # of them as they arrive. The shared queue holds at most `depth` batches
+    # per source, which bounds memory when the consumer is slower.
+    buffer = queue.Queue(maxsize=depth * max(len(sources), 1))
+    stop = threading.Event()
+    failure = []
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce(source):
+        try:
+            for batch in source:
+                if not put(batch):
+                    break
+        except Exception as e:
+            failure.append(e)
+        finally:
+            source.close()
+            put(_DONE)
+
+    threads = [threading.Thread(target=produce, args=(source,), daemon=True) for source in sources]
+    for thread in threads:
+        thread.start()
+    try:
+        remaining = len(threads)
+        while remaining:
+            batch = buffer.get()
+            if batch is _DONE:
+                remaining -= 1
+                continue
+            yield batch
+            if failure:
+                break
+        if failure:
+            raise failure[0]
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def _rows(batches):
+    for batch in batches:
+        yield from batch
+
+
+def stream_users_in_batches_sharded(batch_size, ordered=False, depth=1):
+    """Yields lists of up to batch_size user dicts from all shards.
+
+    Unordered, batches come from whichever shard delivers first. Ordered,
+    every shard is read in user_id order (each still in its own thread) and
+    the rows are merged with heapq.merge before being re-batched.
+    """
+    connections = seed.shard_connections()
+    if not connections:
+        return
+    sources = [_shard_batches(connection, batch_size, ordered) for connection in connections]
+    if not ordered:
+        yield from fan_in(sources, depth)
+        return
+
+    streams = [fan_in([source], depth) for source in sources]
+    try:
+        batch = []
+        for row in heapq.merge(*map(_rows, streams), key=lambda row: row["user_id"]):
+            batch.append(row)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        for stream in streams:
+            stream.close()
+
+
+def stream_users_sharded(fetch_size=1000, ordered=False):
+    """Yields user dicts one by one from all shards"""
+    yield from _rows(stream_users_in_batches_sharded(fetch_size, ordered))
+
+
+if __name__ == "__main__":
+    count = 0
+    for user in stream_users_sharded(ordered=True):
+        count += 1
+        if count <= 5:
+            print(user)
+    print(f"Streamed {count} users")
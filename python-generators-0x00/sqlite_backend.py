@@ -0,0 +1,137 @@
+#!/usr/bin/python3
+"""SQLite stand-in for the ALX_prodev MySQL database.
+
+Wraps sqlite3 in the small part of the mysql-connector API the generator
+scripts use (cursor(dictionary=..., buffered=...), %s placeholders,
+fetchmany, commit/close), so they can run against a local file without a
+MySQL server. seed.connect_to_prodev() returns one of these connections when
+USER_DATA_SQLITE is set to a database path.
+"""
+import math
+import sqlite3
+
+# Counters for benchmarks; reset() before a measured run
+stats = {"connections": 0, "queries": 0}
+
+
+def reset():
+    stats["connections"] = 0
+    stats["queries"] = 0
+
+
+class _VarPop:
+    """VAR_POP aggregate (Welford), which SQLite lacks"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def step(self, value):
+        if value is None:
+            return
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def finalize(self):
+        return self.m2 / self.count if self.count else None
+
+
+class SQLiteCursor:
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection.raw.cursor()
+        self._dictionary = dictionary
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def _convert(self, rows):
+        if not self._dictionary:
+            return rows
+        columns = [column[0] for column in self._cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def execute(self, query, params=()):
+        stats["queries"] += 1
+        self._cursor.execute(query.replace("%s", "?"), tuple(params or ()))
+
+    def executemany(self, query, rows):
+        stats["queries"] += 1
+        self._cursor.executemany(query.replace("%s", "?"), rows)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return None if row is None else self._convert([row])[0]
+
+    def fetchmany(self, size=1):
+        return self._convert(self._cursor.fetchmany(size))
+
+    def fetchall(self):
+        return self._convert(self._cursor.fetchall())
+
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany(1000)
+            if not rows:
+                return
+            yield from rows
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    def __init__(self, path):
+        stats["connections"] += 1
+        self.path = path
+        self.raw = sqlite3.connect(path, check_same_thread=False)
+        self.raw.create_function("FLOOR", 1, lambda value: None if value is None else math.floor(value))
+        self.raw.create_aggregate("VAR_POP", 1, _VarPop)
+
+    def cursor(self, dictionary=False, buffered=None):
+        # sqlite3 cursors already step through results lazily
+        return SQLiteCursor(self, dictionary)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        return None
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self.raw.close()
+
+
+def connect(path):
+    return SQLiteConnection(path)
+
+
+def create_user_data(connection):
+    cursor = connection.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_data (
+            user_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+        )
+    """)
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_email ON user_data (email)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_age ON user_data (age)")
+    cursor.close()
+    connection.commit()
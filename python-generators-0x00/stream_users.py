@@ -1,25 +1,30 @@
-import mysql.connector
 from mysql.connector import Error
 
-def stream_users():
+from seed import USER_FIELDS, connect_to_prodev
+
+def stream_users(fetch_size=1000):
     """Yields users from the user_data table one by one"""
+    connection = None
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='root',
-            database='ALX_prodev'
-        )
+        connection = connect_to_prodev(dedicated=True)
+        if connection is None:
+            return
 
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM user_data")
+        # Unbuffered so rows are streamed from the server fetch_size at a time
+        cursor = connection.cursor(dictionary=True, buffered=False)
+        cursor.execute(f"SELECT {USER_FIELDS} FROM user_data")
 
-        for row in cursor:
-            yield row
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield from rows
 
         cursor.close()
-        connection.close()
 
     except Error as e:
         print(f"Error: {e}")
         return
+    finally:
+        if connection is not None:
+            connection.close()
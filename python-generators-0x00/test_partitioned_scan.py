@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Smoke test for partitioned_scan.py on a SQLite stand-in of user_data"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import generate_user_data
+import partitioned_scan
+import seed
+import sqlite_backend
+
+
+def user_ids(batch):
+    """Batch function for parallel_scan (must be picklable)"""
+    return [user["user_id"] for user in batch]
+
+
+def count_rows(batch):
+    """Reducing batch function: one count per batch instead of the rows"""
+    return [len(batch)]
+
+
+class TestParallelScan(unittest.TestCase):
+    """parallel_scan against a small synthetic table"""
+
+    ROWS = 500
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.env = patch.dict(os.environ, {"USER_DATA_SQLITE": self.path})
+        self.env.start()
+        connection = seed.connect_to_prodev()
+        sqlite_backend.create_user_data(connection)
+        generate_user_data.load_table(connection, self.ROWS)
+        connection.close()
+
+    def tearDown(self):
+        self.env.stop()
+        os.remove(self.path)
+
+    def test_scan_covers_every_row_once(self):
+        """Every user_id comes back exactly once across the partitions"""
+        ids = [
+            user_id
+            for batch in partitioned_scan.parallel_scan(user_ids, processes=2, partitions=4, batch_size=50)
+            for user_id in batch
+        ]
+        self.assertEqual(len(ids), self.ROWS)
+        self.assertEqual(len(set(ids)), self.ROWS)
+
+    def test_ordered_scan_is_sorted(self):
+        """ordered=True yields user_ids in key order"""
+        ids = [
+            user_id
+            for batch in partitioned_scan.parallel_scan(user_ids, processes=2, partitions=4, ordered=True)
+            for user_id in batch
+        ]
+        self.assertEqual(ids, sorted(ids))
+
+    def test_reducing_scan_with_few_pending_ranges(self):
+        """A reducing func over many small ranges, two ranges pending at a time"""
+        counts = partitioned_scan.parallel_scan(
+            count_rows, processes=2, partitions=16, ordered=True, max_pending=2
+        )
+        self.assertEqual(sum(count for batch in counts for count in batch), self.ROWS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,16 +1,97 @@
 import mysql.connector
 import csv
+import json
+import os
+import threading
+import time
 import uuid
 from mysql.connector import Error
+from mysql.connector.errors import PoolError
+from mysql.connector.pooling import MySQLConnectionPool
+
+INSERT_USER_QUERY = """
+INSERT INTO user_data (user_id, name, email, age)
+VALUES (%s, %s, %s, %s)
+"""
+
+UPSERT_USER_QUERY = """
+INSERT INTO user_data (user_id, name, email, age)
+VALUES (%s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE name = VALUES(name), email = VALUES(email), age = VALUES(age)
+"""
+
+# Fixed namespace so the same email always maps to the same user_id
+USER_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_DNS, 'user_data.alx_prodev')
+
+POOL_SIZE = int(os.environ.get('MYSQL_POOL_SIZE', '5'))
+POOL_TIMEOUT = float(os.environ.get('MYSQL_POOL_TIMEOUT', '30'))
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def db_config(database='ALX_prodev'):
+    """Returns connection settings read from the environment
+
+    MYSQL_HOST, MYSQL_PORT, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DATABASE and
+    MYSQL_CONNECT_TIMEOUT override the local development defaults.
+    """
+    config = {
+        'host': os.environ.get('MYSQL_HOST', 'localhost'),
+        'port': int(os.environ.get('MYSQL_PORT', '3306')),
+        'user': os.environ.get('MYSQL_USER', 'root'),
+        'password': os.environ.get('MYSQL_PASSWORD', 'root'),
+        'connection_timeout': int(os.environ.get('MYSQL_CONNECT_TIMEOUT', '10')),
+    }
+    if database:
+        config['database'] = os.environ.get('MYSQL_DATABASE', database)
+    return config
+
+def get_pool():
+    """Returns this process's connection pool, creating it on first use"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        # A pool inherited through fork shares the parent's sockets
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = MySQLConnectionPool(
+                pool_name=f'alx_prodev_{os.getpid()}',
+                pool_size=POOL_SIZE,
+                pool_reset_session=True,
+                # Only short results are read on pooled connections (full-table
+                # streams use connect_to_prodev(dedicated=True)), so draining
+                # leftover rows on return is cheap
+                consume_results=True,
+                **db_config()
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+def get_connection(timeout=POOL_TIMEOUT):
+    """Checks a healthy connection out of the pool, waiting up to timeout seconds"""
+    pool = get_pool()
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            connection = pool.get_connection()
+            break
+        except PoolError:
+            # The pool fails immediately when exhausted; wait for a return
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+    # Reconnect transparently if the server dropped the idle connection
+    try:
+        connection.ping(reconnect=True, attempts=1, delay=0)
+    except Error:
+        connection.close()  # hand the slot back to the pool
+        raise
+    return connection
 
 def connect_db():
     """Connects to the MySQL database server"""
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='root'
-        )
+        connection = mysql.connector.connect(**db_config(database=None))
         return connection
     except Error as e:
         print(f"Error connecting to MySQL: {e}")
@@ -26,16 +107,19 @@ def create_database(connection):
     except Error as e:
         print(f"Error creating database: {e}")
 
-def connect_to_prodev():
-    """Connects to the ALX_prodev database in MySQL"""
+def connect_to_prodev(allow_local_infile=False, dedicated=False):
+    """Connects to the ALX_prodev database in MySQL
+
+    Connections come from the pool and are returned to it by close().
+    allow_local_infile needs a dedicated connection, so it bypasses the pool.
+    dedicated=True bypasses it too; unbuffered full-table streams use it so
+    that stopping early drops the socket instead of reading the rest of the
+    result back into the pool.
+    """
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='root',
-            database='ALX_prodev'
-        )
-        return connection
+        if allow_local_infile or dedicated:
+            return mysql.connector.connect(allow_local_infile=allow_local_infile, **db_config())
+        return get_connection()
     except Error as e:
         print(f"Error connecting to ALX_prodev: {e}")
         return None
@@ -46,11 +130,12 @@ def create_table(connection):
         cursor = connection.cursor()
         create_table_query = """
         CREATE TABLE IF NOT EXISTS user_data (
-            user_id CHAR(36) PRIMARY KEY,
+            user_id CHAR(36) CHARACTER SET ascii COLLATE ascii_bin NOT NULL PRIMARY KEY,
             name VARCHAR(255) NOT NULL,
             email VARCHAR(255) NOT NULL,
             age DECIMAL(3,0) NOT NULL,
-            INDEX idx_user_id (user_id)
+            UNIQUE INDEX idx_email (email),
+            INDEX idx_age (age)
         )
         """
         cursor.execute(create_table_query)
@@ -59,6 +144,74 @@ def create_table(connection):
     except Error as e:
         print(f"Error creating table: {e}")
 
+def create_age_index(connection):
+    """Adds the idx_age index used by age filters to an existing user_data table"""
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = 'user_data'
+        AND index_name = 'idx_age'
+        """)
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("CREATE INDEX idx_age ON user_data (age)")
+            print("Index idx_age created successfully")
+        cursor.close()
+    except Error as e:
+        print(f"Error creating index: {e}")
+
+def migrate_user_data_schema(connection):
+    """Brings an existing user_data table in line with create_table
+
+    All changes run as a single ALTER TABLE, so the table is rebuilt once:
+    user_id becomes ascii CHAR(36) (a 36-byte key instead of up to 144 bytes
+    under utf8mb4, in the primary key and every secondary index), the
+    idx_user_id index that duplicates the primary key is dropped, and idx_age
+    and a unique idx_email are added. The unique index is skipped, with a
+    message, while duplicated emails remain.
+    """
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+        SELECT DISTINCT index_name FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = 'user_data'
+        """)
+        indexes = {name for (name,) in cursor.fetchall()}
+        cursor.execute("""
+        SELECT character_set_name FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = 'user_data'
+        AND column_name = 'user_id'
+        """)
+        (charset,) = cursor.fetchone()
+
+        changes = []
+        if charset != 'ascii':
+            changes.append("MODIFY user_id CHAR(36) CHARACTER SET ascii COLLATE ascii_bin NOT NULL")
+        if 'idx_user_id' in indexes:
+            changes.append("DROP INDEX idx_user_id")
+        if 'idx_age' not in indexes:
+            changes.append("ADD INDEX idx_age (age)")
+        if 'idx_email' not in indexes:
+            cursor.execute("""
+            SELECT COUNT(*) FROM (
+                SELECT email FROM user_data GROUP BY email HAVING COUNT(*) > 1
+            ) AS duplicates
+            """)
+            duplicates = cursor.fetchone()[0]
+            if duplicates:
+                print(f"Skipping unique idx_email: {duplicates} duplicated emails")
+            else:
+                changes.append("ADD UNIQUE INDEX idx_email (email)")
+
+        if changes:
+            cursor.execute(f"ALTER TABLE user_data {', '.join(changes)}")
+            print(f"Table user_data migrated: {'; '.join(changes)}")
+        else:
+            print("Table user_data already up to date")
+        cursor.close()
+    except Error as e:
+        print(f"Error migrating table: {e}")
+
 def insert_data(connection, csv_file):
     """Inserts data in the database if it does not exist"""
     try:
@@ -92,3 +245,194 @@ def insert_data(connection, csv_file):
         print(f"Error inserting data: {e}")
     except FileNotFoundError:
         print(f"CSV file {csv_file} not found")
+
+
+def read_csv_chunks(csv_file, chunk_size=1000):
+    """Generator that yields lists of user_data rows read from the CSV in chunks"""
+    with open(csv_file, 'r', newline='', encoding='utf-8') as file:
+        csv_reader = csv.DictReader(file)
+        chunk = []
+        for row in csv_reader:
+            chunk.append((str(uuid.uuid4()), row['name'], row['email'], int(row['age'])))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+
+def bulk_insert_rows(connection, chunks):
+    """Inserts each chunk with a multi-row INSERT and commits per chunk.
+
+    Returns the number of rows inserted and the elapsed time in seconds.
+    """
+    cursor = connection.cursor()
+    total_rows = 0
+    start_time = time.perf_counter()
+    try:
+        for chunk in chunks:
+            # executemany rewrites INSERT ... VALUES into a single multi-row statement
+            cursor.executemany(INSERT_USER_QUERY, chunk)
+            connection.commit()
+            total_rows += len(chunk)
+    finally:
+        cursor.close()
+    return total_rows, time.perf_counter() - start_time
+
+
+def load_data_infile(connection, csv_file):
+    """Loads the CSV server-side with LOAD DATA LOCAL INFILE.
+
+    The connection must be opened with allow_local_infile=True and the server
+    must have local_infile enabled. Returns the number of rows loaded.
+    """
+    with open(csv_file, 'r', newline='', encoding='utf-8') as file:
+        header = next(csv.reader(file), [])
+
+    # Map CSV columns onto table columns, discarding anything unknown
+    columns = [name if name in ('name', 'email', 'age') else '@skip' for name in header]
+    load_query = f"""
+    LOAD DATA LOCAL INFILE %s INTO TABLE user_data
+    CHARACTER SET utf8mb4
+    FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+    LINES TERMINATED BY '\\n'
+    IGNORE 1 LINES
+    ({', '.join(columns)})
+    SET user_id = UUID()
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute(load_query, (csv_file,))
+        connection.commit()
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def insert_data_bulk(connection, csv_file, chunk_size=1000, local_infile=False):
+    """Inserts data in the database in chunks if it does not exist.
+
+    Streams the CSV in chunks of chunk_size rows, inserts each chunk with a
+    multi-row INSERT and commits per chunk so no single transaction spans the
+    whole file. With local_infile=True, LOAD DATA LOCAL INFILE is tried first
+    and the chunked path is used if the server or connection refuses it.
+    """
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM user_data")
+        count = cursor.fetchone()[0]
+        cursor.close()
+
+        if count > 0:
+            print("Data already exists in the table")
+            return
+
+        start_time = time.perf_counter()
+        total_rows = None
+        if local_infile:
+            try:
+                total_rows = load_data_infile(connection, csv_file)
+            except Error as e:
+                print(f"LOAD DATA LOCAL INFILE unavailable, using chunked inserts: {e}")
+                connection.rollback()
+
+        if total_rows is None:
+            total_rows, _ = bulk_insert_rows(connection, read_csv_chunks(csv_file, chunk_size))
+
+        elapsed = time.perf_counter() - start_time
+        rate = total_rows / elapsed if elapsed > 0 else 0
+        print(f"Data inserted successfully: {total_rows} rows in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    except Error as e:
+        print(f"Error inserting data: {e}")
+    except FileNotFoundError:
+        print(f"CSV file {csv_file} not found")
+
+
+def user_id_for(email):
+    """Returns the deterministic user_id (uuid5) for an email address"""
+    return str(uuid.uuid5(USER_ID_NAMESPACE, email.strip().lower()))
+
+
+def read_csv_records(csv_file, start_offset=0):
+    """Generator that yields (row, end_offset) pairs from the CSV.
+
+    The file is read in binary mode so the byte offset after each row is
+    exact and can be used to resume with start_offset. Rows are parsed line
+    by line, so quoted fields must not contain embedded newlines.
+    """
+    with open(csv_file, 'rb') as file:
+        header = next(csv.reader([file.readline().decode('utf-8-sig')]), [])
+        if start_offset > file.tell():
+            file.seek(start_offset)
+
+        for line in iter(file.readline, b''):
+            values = next(csv.reader([line.decode('utf-8')]), None)
+            if values:
+                yield dict(zip(header, values)), file.tell()
+
+
+def read_checkpoint(checkpoint_file, csv_file):
+    """Returns (offset, rows) saved in the checkpoint, or (0, 0) to start over"""
+    try:
+        with open(checkpoint_file, 'r', encoding='utf-8') as file:
+            checkpoint = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return 0, 0
+
+    # A checkpoint written for a different or truncated file is useless
+    if checkpoint.get('offset', 0) > os.path.getsize(csv_file):
+        return 0, 0
+    return checkpoint.get('offset', 0), checkpoint.get('rows', 0)
+
+
+def write_checkpoint(checkpoint_file, offset, rows):
+    """Atomically records the CSV byte offset reached by committed batches"""
+    temp_file = f"{checkpoint_file}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as file:
+        json.dump({'offset': offset, 'rows': rows}, file)
+    os.replace(temp_file, checkpoint_file)
+
+
+def insert_data_resumable(connection, csv_file, batch_size=1000, checkpoint_file=None):
+    """Upserts data from the CSV in batches, resuming from the last checkpoint.
+
+    user_id is derived from the email, so re-running the load updates rows in
+    place instead of duplicating them. After every committed batch the CSV
+    byte offset is checkpointed; an interrupted load restarts from there and
+    at worst re-applies the last batch, which the upsert makes harmless.
+    """
+    checkpoint_file = checkpoint_file or f"{csv_file}.checkpoint"
+    try:
+        offset, total_rows = read_checkpoint(checkpoint_file, csv_file)
+        if offset:
+            print(f"Resuming {csv_file} at byte {offset} ({total_rows} rows already loaded)")
+
+        cursor = connection.cursor()
+        batch = []
+        start_time = time.perf_counter()
+        try:
+            for row, end_offset in read_csv_records(csv_file, offset):
+                batch.append((user_id_for(row['email']), row['name'], row['email'], int(row['age'])))
+                if len(batch) == batch_size:
+                    cursor.executemany(UPSERT_USER_QUERY, batch)
+                    connection.commit()
+                    total_rows += len(batch)
+                    write_checkpoint(checkpoint_file, end_offset, total_rows)
+                    batch = []
+
+            if batch:
+                cursor.executemany(UPSERT_USER_QUERY, batch)
+                connection.commit()
+                total_rows += len(batch)
+        finally:
+            cursor.close()
+
+        if os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
+        elapsed = time.perf_counter() - start_time
+        print(f"Data upserted successfully: {total_rows} rows ({elapsed:.2f}s this run)")
+    except Error as e:
+        print(f"Error upserting data: {e}")
+    except FileNotFoundError:
+        print(f"CSV file {csv_file} not found")